@@ -3,15 +3,36 @@ import logging
 import logging.config
 import yaml
 
+from xetra.common.constants import StorageBackend
+from xetra.common.local import LocalFileConnector
+from xetra.common.materialization import MaterializationConfig
+from xetra.common.meta_process import MetaProcess
+from xetra.common.planner import PlannerConfig
+from xetra.common.profiling import StageProfiler
 from xetra.common.s3 import S3BucketConnector
+from xetra.common.symbol_table import SymbolTableConfig
+from xetra.common.throttle import ThrottleConfig
+from xetra.transformers.distributed import WorkerConfig, XetraShardWorker
+from xetra.transformers.compaction import CompactionConfig, ReportCompactor
+from xetra.transformers.intraday import IntradayConfig, XetraIntradayService
+from xetra.transformers.rolling_window import RollingWindowConfig
 from xetra.transformers.xetra_transformers import XetraETL, XetraSourceConfig, XetraTargetConfig
 
 
 def main():
-    # Parse YAML file
-    # parser = argparse.ArgumentParser(description='Run xetra ETL job')
+    # Parse command line arguments
     # parser.add_argument('config', help='A configuration file in YAML format')
-    # args = parser.parse_args()
+    parser = argparse.ArgumentParser(description='Run xetra ETL job')
+    parser.add_argument('--mode', choices=['etl', 'worker', 'compact', 'intraday'], default='etl',
+                        help='etl: run report 1, worker: run report 1 shards next to other workers, '
+                             'compact: merge the report 1 output files, '
+                             'intraday: publish intraday snapshots as new source files land')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='write cProfile dumps, collapsed stacks and top allocation sites '
+                             'of every ETL stage to DIR')
+    args = parser.parse_args()
+
+    # Parse YAML file
     config_path = '/Users/andreydavidov/pythonProject/prod_ETL/configs/xetra_report1_config.yaml'
     config = yaml.safe_load(open(config_path))
 
@@ -29,14 +50,22 @@ def main():
     # Reading s3 configuration
     s3_config = config['s3']
 
-    # Creating the S3BucketConnerctor class instance for source and target
-    s3_bucket_src = S3BucketConnector(profile_name=s3_config['profile_name'],
-                                      end_point_url=s3_config['src_endpoint_url'],
-                                      bucket=s3_config['src_bucket'])
+    # Creating the storage connectors for source and target
+    if s3_config.get('backend', StorageBackend.S3.value) == StorageBackend.LOCAL.value:
+        local_config = config['local']
+        s3_bucket_src = LocalFileConnector(root_dir=local_config['src_root_dir'])
+        s3_bucket_target = LocalFileConnector(root_dir=local_config['trg_root_dir'])
+    else:
+        throttle_config = ThrottleConfig(**config['throttle'])
+        s3_bucket_src = S3BucketConnector(profile_name=s3_config['profile_name'],
+                                          end_point_url=s3_config['src_endpoint_url'],
+                                          bucket=s3_config['src_bucket'],
+                                          throttle_args=throttle_config)
 
-    s3_bucket_target = S3BucketConnector(profile_name=s3_config['profile_name'],
-                                         end_point_url=s3_config['trg_endpoint_url'],
-                                         bucket=s3_config['trg_bucket'])
+        s3_bucket_target = S3BucketConnector(profile_name=s3_config['profile_name'],
+                                             end_point_url=s3_config['trg_endpoint_url'],
+                                             bucket=s3_config['trg_bucket'],
+                                             throttle_args=throttle_config)
 
     # Reading source configuration
     source_config = XetraSourceConfig(**config['source'])
@@ -47,13 +76,68 @@ def main():
     # Reading meta file configuration
     meta_config = config['meta']
 
+    # Reading ISIN symbol table configuration
+    symbol_config = SymbolTableConfig(**config['symbols'])
+
+    # Reading execution planner configuration
+    planner_config = PlannerConfig(**config['planner'])
+
+    # Reading rolling-window configuration
+    rolling_config = RollingWindowConfig(**config['rolling'])
+
+    # Reading per-day aggregate materialization configuration
+    materialization_config = MaterializationConfig(**config['materialization'])
+
+    # Reading compaction configuration
+    compaction_config = CompactionConfig(**config['compaction'])
+
+    if args.mode == 'compact':
+        logger.info('Xetra compaction job started')
+        compactor = ReportCompactor(s3_bucket_target, compaction_config, target_config.trg_key,
+                                    target_config.trg_key_date_format,
+                                    source_config.src_col_date, source_config.src_col_isin)
+        compactor.compact()
+        logger.info('Xetra compaction job finished.')
+        return
+
+    if args.mode == 'intraday':
+        # polling the source until interrupted
+        intraday_service = XetraIntradayService(s3_bucket_src, s3_bucket_target, source_config,
+                                                target_config, IntradayConfig(**config['intraday']))
+        try:
+            intraday_service.run_forever()
+        except KeyboardInterrupt:
+            logger.info('Xetra intraday service interrupted.')
+        return
+
+    # Profiling the stages only on demand, nothing is instrumented otherwise
+    profiler = StageProfiler(args.profile) if args.profile else None
+    if profiler:
+        profiler.instrument(MetaProcess, MetaProcess.PROFILE_STAGES)
+
     # Creating XetraETL class instance
     logger.info('Xetra ETL job started')
     xetra_etl = XetraETL(s3_bucket_src, s3_bucket_target,
-                         meta_config['meta_key'], source_config, target_config)
+                         meta_config['meta_key'], source_config, target_config,
+                         planner_config, rolling_config, materialization_config,
+                         compaction_config, symbol_config)
+    if profiler:
+        profiler.instrument(xetra_etl, XetraETL.PROFILE_STAGES)
+
+    if args.mode == 'worker':
+        # processing date shards and merging them once all workers are done.
+        # Shards of a crashed worker are only taken over after lease_seconds by a worker that is
+        # started afterwards, so a failed worker has to be followed by another worker run.
+        worker = XetraShardWorker(xetra_etl, WorkerConfig(**config['worker']))
+        worker.run()
+        worker.merge()
+        logger.info('Xetra ETL worker finished.')
+        return
 
     # creating ETL job for Xetra report 1
     xetra_etl.etl_report1()
+    logger.info('Source request metrics: %s', s3_bucket_src.request_metrics)
+    logger.info('Target request metrics: %s', s3_bucket_target.request_metrics)
     logger.info('Xetra ETL job finished.')
 
 
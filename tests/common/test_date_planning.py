@@ -0,0 +1,118 @@
+""" Test date planning methods """
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from xetra.common.constants import MetaProcessFormat
+from xetra.common.date_planning import (batch_dates, format_dates, missing_ranges, parse_dates, plan_dates,
+                                        range_ids)
+from xetra.common.local import LocalFileConnector
+from xetra.common.meta_process import MetaProcess
+
+
+class TestDatePlanning(unittest.TestCase):
+    """
+    Testing the date planning methods.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.s3_bucket_meta = LocalFileConnector(root_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        self.tmp_dir.cleanup()
+
+    def test_plan_dates_with_gaps(self):
+        """
+        Tests that only the missing ranges and their previous days are planned
+        """
+        # Test init
+        processed_days = parse_dates(['2021-04-01', '2021-04-02', '2021-04-04', '2021-04-05',
+                                      '2021-04-06', '2021-04-09', '2021-04-09'])
+
+        # Method execution
+        date_plan = plan_dates(np.datetime64('2021-04-01'), np.datetime64('2021-04-10'), processed_days)
+
+        # Test after method execution
+        self.assertEqual('2021-04-03', date_plan.first_date)
+        self.assertEqual(['2021-04-03', '2021-04-07', '2021-04-08', '2021-04-10'], date_plan.process_dates)
+        self.assertEqual(['2021-04-02', '2021-04-03', '2021-04-06', '2021-04-07', '2021-04-08',
+                          '2021-04-09', '2021-04-10'], date_plan.extract_dates)
+        self.assertEqual([('2021-04-03', '2021-04-03'), ('2021-04-07', '2021-04-08'),
+                          ('2021-04-10', '2021-04-10')], date_plan.missing_ranges)
+
+    def test_plan_dates_nothing_missing(self):
+        """
+        Tests the plan when all dates are processed
+        """
+        # Method execution
+        date_plan = plan_dates(np.datetime64('2021-04-01'), np.datetime64('2021-04-02'),
+                               parse_dates(['2021-04-01', '2021-04-02']))
+
+        # Test after method execution
+        self.assertEqual('2200-01-01', date_plan.first_date)
+        self.assertEqual(([], [], []), (date_plan.process_dates, date_plan.extract_dates, date_plan.missing_ranges))
+        self.assertEqual(([], []), tuple(format_dates(days) for days in missing_ranges(parse_dates([]))))
+
+    def test_batch_dates_splits_at_gaps(self):
+        """
+        Tests that batches have at most batch_days consecutive days
+        """
+        # Test init
+        days = parse_dates(['2021-04-01', '2021-04-02', '2021-04-03', '2021-04-04', '2021-04-05',
+                            '2021-04-08', '2021-04-09'])
+
+        # Method execution
+        batches = [format_dates(batch) for batch in batch_dates(days, 2)]
+
+        # Test after method execution
+        self.assertEqual([['2021-04-01', '2021-04-02'], ['2021-04-03', '2021-04-04'], ['2021-04-05'],
+                          ['2021-04-08', '2021-04-09']], batches)
+        self.assertEqual([], batch_dates(parse_dates([]), 2))
+
+    def test_range_ids_of_consecutive_extract_days(self):
+        """
+        Tests that days are numbered by their range of consecutive extract days
+        """
+        # Test init
+        extract_days = parse_dates(['2021-04-02', '2021-04-03', '2021-04-06', '2021-04-07', '2021-04-09'])
+
+        # Method execution
+        ids = range_ids(parse_dates(['2021-04-09', '2021-04-03', '2021-04-06', '2021-04-02', '2021-04-07']),
+                        extract_days)
+
+        # Test after method execution
+        self.assertEqual([2, 0, 1, 0, 1], list(ids))
+
+    def test_return_date_plan_skips_processed_days_after_gap(self):
+        """
+        Tests return_date_plan with a meta file that misses an old date
+        """
+        # Test init
+        meta_key = 'meta.csv'
+        dates = [(datetime.today().date() - timedelta(days=day))
+                 .strftime(MetaProcessFormat.META_DATE_FORMAT.value) for day in range(5, -1, -1)]
+        MetaProcess.update_meta_file(dates[:2] + dates[3:], meta_key, self.s3_bucket_meta)
+
+        # Method execution
+        date_plan = MetaProcess.return_date_plan(dates[0], meta_key, self.s3_bucket_meta)
+        min_date, date_list = MetaProcess.return_date_list(dates[0], meta_key, self.s3_bucket_meta)
+
+        # Test after method execution
+        self.assertEqual([dates[2]], date_plan.process_dates)
+        self.assertEqual(dates[1:3], date_plan.extract_dates)
+        self.assertEqual(dates[2], min_date)
+        self.assertEqual(dates[1:], date_list)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+""" Test local filesystem connector methods """
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from xetra.common.constants import MetaProcessFormat
+from xetra.common.common_exceptions import WrongFormatException
+from xetra.common.local import LocalFileConnector
+from xetra.common.meta_process import MetaProcess
+
+
+class TestLocalFileConnector(unittest.TestCase):
+    """
+    Testing the LocalFileConnector class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.local_conn = LocalFileConnector(root_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        self.tmp_dir.cleanup()
+
+    def put_file(self, key: str, content: str):
+        """
+        Creates a file in the root directory
+        """
+        path = os.path.join(self.tmp_dir.name, *key.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(content)
+
+    def test_list_files_in_prefix_ok(self):
+        """
+        Tests the list_files_in_prefix method with S3 prefix semantics
+        """
+        # Test init
+        for key in ['2021-04-16/a.csv', '2021-04-16/b.csv', '2021-04-17/a.csv', 'other/2021-04-16.csv']:
+            self.put_file(key, 'col1,col2\nvalA,valB')
+
+        # Method execution
+        list_day = self.local_conn.list_file_in_prefix('2021-04-16')
+        list_month = self.local_conn.list_file_in_prefix('2021-04')
+        list_wrong = self.local_conn.list_file_in_prefix('prefix/')
+
+        # Tests after method execution
+        self.assertEqual(['2021-04-16/a.csv', '2021-04-16/b.csv'], list_day)
+        self.assertEqual(3, len(list_month))
+        self.assertEqual([], list_wrong)
+
+    def test_list_objects_in_prefix_etag_changes(self):
+        """
+        Tests that list_objects_in_prefix returns sizes and an ETag that changes with the file
+        """
+        # Test init
+        key = '2021-04-16/a.csv'
+        self.put_file(key, 'col1\nval1')
+        etag_old = self.local_conn.list_objects_in_prefix('2021-04-16')[0].etag
+        self.put_file(key, 'col1\nval1\nval2')
+
+        # Method execution
+        objects = self.local_conn.list_objects_in_prefix('2021-04-16')
+
+        # Tests after method execution
+        self.assertEqual(1, len(objects))
+        self.assertEqual(key, objects[0].key)
+        self.assertEqual(14, objects[0].size)
+        self.assertNotEqual(etag_old, objects[0].etag)
+
+    def test_write_and_read_df(self):
+        """
+        Tests write_df_to_s3_bucket and reading the csv and parquet file back
+        """
+        # Expected result
+        df_exp = pd.DataFrame([['A', 'B'], ['C', 'D']], columns=['col1', 'col2'])
+
+        # Method execution
+        with self.assertLogs() as logm:
+            self.local_conn.write_df_to_s3_bucket(df_exp, 'out/test.csv', 'csv')
+            self.local_conn.write_df_to_s3_bucket(df_exp, 'out/test.parquet', 'parquet')
+            df_csv = self.local_conn.read_csv_to_data_frame('out/test.csv', columns=['col2'])
+            df_parquet = self.local_conn.read_parquet_to_data_frame('out/test.parquet')
+            df_projected = self.local_conn.read_parquet_to_data_frame('out/test.parquet', columns=['col1'],
+                                                                      filters=[('col2', '==', 'D')])
+
+        # Tests after method execution
+        self.assertTrue(df_exp[['col2']].equals(df_csv))
+        self.assertTrue(df_exp.equals(df_parquet))
+        self.assertEqual(['C'], list(df_projected.col1))
+        self.assertEqual(['out/test.csv', 'out/test.parquet'], self.local_conn.list_file_in_prefix('out/'))
+        with self.assertRaises(WrongFormatException):
+            self.local_conn.write_df_to_s3_bucket(df_exp, 'out/test.json', 'json')
+        with self.assertRaises(self.local_conn.no_such_key):
+            self.local_conn.read_csv_to_data_frame('out/missing.csv')
+
+    def test_meta_process_on_local_backend(self):
+        """
+        Tests MetaProcess running on the local backend
+        """
+        # Test init
+        meta_key = 'meta/meta.csv'
+        today = datetime.today().strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+
+        # Method execution
+        min_date, date_list = MetaProcess.return_date_list(today, meta_key, self.local_conn)
+        MetaProcess.update_meta_file([today], meta_key, self.local_conn)
+        min_date_after, date_list_after = MetaProcess.return_date_list(today, meta_key, self.local_conn)
+
+        # Tests after method execution
+        self.assertEqual(today, min_date)
+        self.assertEqual(2, len(date_list))
+        self.assertEqual([], date_list_after)
+
+
+if __name__ == "__main__":
+    unittest.main()
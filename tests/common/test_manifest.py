@@ -0,0 +1,80 @@
+""" Test report manifest methods """
+
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from xetra.common.common_exceptions import ManifestConflictException
+from xetra.common.local import LocalFileConnector
+from xetra.common.manifest import ReportManifest
+
+
+class TestReportManifest(unittest.TestCase):
+    """
+    Testing the ReportManifest class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.s3_bucket = LocalFileConnector(root_dir=self.tmp_dir.name)
+        self.manifest = ReportManifest(self.s3_bucket, 'report1/_manifest.json', 'Date', 'ISIN')
+        self.other_writer = ReportManifest(self.s3_bucket, 'report1/_manifest.json', 'Date', 'ISIN')
+        self.data_frame = pd.DataFrame({'ISIN': ['AT1', 'DE2'], 'Date': ['2021-04-16', '2021-04-16']})
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        self.tmp_dir.cleanup()
+
+    def test_add_files_reapplied_after_lost_update(self):
+        """
+        Tests that an update overwritten by another writer is applied again to the new version
+        """
+        # Test init
+        write_object = self.s3_bucket.write_object
+        concurrent_writes = []
+
+        def write_object_with_concurrent_writer(body, key):
+            # the other writer read the manifest before this write and overwrites it
+            manifest = self.other_writer.read()
+            write_object(body, key)
+            if not concurrent_writes:
+                concurrent_writes.append(key)
+                manifest['files'] = manifest['files'] + [self.other_writer.file_entry('b.parquet', self.data_frame)]
+                manifest['version'] += 1
+                write_object(json.dumps(manifest).encode('utf-8'), key)
+
+        # Method execution
+        with patch.object(self.s3_bucket, 'write_object', side_effect=write_object_with_concurrent_writer):
+            with self.assertLogs() as logm:
+                self.manifest.add_files([self.manifest.file_entry('a.parquet', self.data_frame)])
+
+        # Tests after method execution
+        self.assertEqual(['b.parquet', 'a.parquet'], [entry['key'] for entry in self.manifest.read()['files']])
+        self.assertTrue(any('changed by another writer' in line for line in logm.output))
+
+    def test_update_raises_after_max_attempts(self):
+        """
+        Tests that ManifestConflictException is raised when every attempt conflicts
+        """
+        # Test init
+        with patch.object(self.manifest, 'write', side_effect=ManifestConflictException), \
+                patch('xetra.common.manifest.time.sleep'):
+            # Method execution
+            with self.assertLogs() as logm:
+                with self.assertRaises(ManifestConflictException):
+                    self.manifest.add_files([self.manifest.file_entry('a.parquet', self.data_frame)])
+
+        # Tests after method execution
+        self.assertEqual(4, len(logm.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+""" Test per-day aggregate materialization methods """
+
+import unittest
+
+from xetra.common.materialization import DayAggregateStore, MaterializationConfig
+from xetra.common.s3 import S3ObjectInfo
+
+
+class TestDayAggregateStore(unittest.TestCase):
+    """
+    Testing the DayAggregateStore class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.objects = [S3ObjectInfo('2021-04-16/a.csv', 10, 'etag1', None),
+                        S3ObjectInfo('2021-04-16/b.csv', 20, 'etag2', None)]
+        self.store = DayAggregateStore(None, MaterializationConfig('materialized/', 7))
+
+    def test_fingerprint_independent_of_listing_order(self):
+        """
+        Tests that the fingerprint doesn't depend on the order of the listing
+        """
+        # Method execution
+        fingerprint1 = DayAggregateStore.fingerprint(self.objects)
+        fingerprint2 = DayAggregateStore.fingerprint(list(reversed(self.objects)))
+
+        # Test after method execution
+        self.assertEqual(fingerprint1, fingerprint2)
+
+    def test_fingerprint_changes_with_republished_file(self):
+        """
+        Tests that a republished file (new ETag) or a new file changes the fingerprint
+        """
+        # Test init
+        republished = [self.objects[0], S3ObjectInfo('2021-04-16/b.csv', 20, 'etag3', None)]
+        added = self.objects + [S3ObjectInfo('2021-04-16/c.csv', 5, 'etag4', None)]
+
+        # Method execution
+        fingerprint = DayAggregateStore.fingerprint(self.objects)
+
+        # Test after method execution
+        self.assertNotEqual(fingerprint, DayAggregateStore.fingerprint(republished))
+        self.assertNotEqual(fingerprint, DayAggregateStore.fingerprint(added))
+        self.assertEqual(f'materialized/2021-04-16/{fingerprint}.parquet',
+                         self.store.artifact_key('2021-04-16', fingerprint))
+
+    def test_changed_dates(self):
+        """
+        Tests that only dates with a stored aggregate of another fingerprint are changed
+        """
+        # Test init
+        republished = [self.objects[0], S3ObjectInfo('2021-04-16/b.csv', 20, 'etag3', None)]
+        unchanged = [S3ObjectInfo('2021-04-15/a.csv', 10, 'etag5', None)]
+        artifacts = {self.store.artifact_key('2021-04-16', DayAggregateStore.fingerprint(self.objects)),
+                     self.store.artifact_key('2021-04-15', DayAggregateStore.fingerprint(unchanged))}
+
+        # Method execution
+        changed_dates = self.store.changed_dates({'2021-04-14': unchanged, '2021-04-15': unchanged,
+                                                  '2021-04-16': republished}, artifacts)
+
+        # Test after method execution
+        self.assertEqual(['2021-04-16'], changed_dates)
+
+
+if __name__ == "__main__":
+    unittest.main()
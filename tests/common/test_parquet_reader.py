@@ -0,0 +1,146 @@
+""" Test projected parquet reader methods """
+
+import unittest
+from io import BytesIO
+
+import boto3
+import numpy as np
+import pandas as pd
+from moto import mock_s3
+
+from xetra.common.parquet_reader import RangeFile, read_parquet_projected
+from xetra.common.s3 import S3BucketConnector
+
+
+def create_report(rows_per_day: int = 2000, days: int = 20):
+    """
+    Report like data frame sorted by date and ISIN
+    """
+    random = np.random.default_rng(1)
+    return pd.DataFrame({
+        'ISIN': [f'DE{number:010d}' for number in range(rows_per_day)] * days,
+        'Date': np.repeat([f'2021-04-{day:02d}' for day in range(1, days + 1)], rows_per_day),
+        'opening_price_eur': random.random(rows_per_day * days),
+        'closing_price_eur': random.random(rows_per_day * days),
+        'daily_traded_volume': random.integers(0, 10000, rows_per_day * days)
+    })
+
+
+class TestReadParquetProjected(unittest.TestCase):
+    """
+    Testing read_parquet_projected with the RangeFile.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.df_report = create_report()
+        out_buffer = BytesIO()
+        self.df_report.to_parquet(out_buffer, engine='pyarrow', index=False, row_group_size=2000)
+        self.parquet_bytes = out_buffer.getvalue()
+
+    def fetch_range(self, range_header: str):
+        """
+        byte-range requests on the in-memory parquet file
+        """
+        start, end = range_header.split('=')[1].split('-')
+        if not start:
+            return self.parquet_bytes[-int(end):], len(self.parquet_bytes)
+        return self.parquet_bytes[int(start):int(end) + 1], len(self.parquet_bytes)
+
+    def test_read_with_filters_and_columns(self):
+        """
+        Tests that only matching rows and the requested columns are returned
+        and only a fraction of the file is fetched
+        """
+        # Expected result
+        df_exp = self.df_report[(self.df_report.Date == '2021-04-05')
+                                & self.df_report.ISIN.isin(['DE0000000007', 'DE0000000042'])]\
+            .loc[:, ['ISIN', 'closing_price_eur']].reset_index(drop=True)
+
+        # Method execution
+        range_file = RangeFile(self.fetch_range)
+        df_result = read_parquet_projected(range_file, columns=['ISIN', 'closing_price_eur'],
+                                           filters=[('Date', '==', '2021-04-05'),
+                                                    ('ISIN', 'in', ['DE0000000007', 'DE0000000042'])])
+
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result)
+        self.assertLess(range_file.bytes_fetched, len(self.parquet_bytes) / 5)
+
+    def test_read_without_matching_row_group(self):
+        """
+        Tests that no column chunk is fetched if the statistics exclude all row groups
+        """
+        # Method execution
+        range_file = RangeFile(self.fetch_range)
+        df_result = read_parquet_projected(range_file, columns=['ISIN'], filters=[('Date', '>', '2021-05-01')])
+
+        # Test after method execution
+        self.assertTrue(df_result.empty)
+        self.assertEqual(['ISIN'], list(df_result.columns))
+        self.assertEqual(1, range_file.requests)
+
+
+class TestS3BucketConnectorParquet(unittest.TestCase):
+    """
+    Testing the projected parquet reads of the S3BucketConnector.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        # Mock s3 connection
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+
+        # Defining class arguments
+        self.s3_endpoint_url = 'https://s3.eu-central1-1.amazonaws.com'
+        self.s3_bucket_name = 'test-bucket'
+        self.profile_name = 'UnitTest'
+
+        # Create a bucket on s3
+        session = boto3.session.Session(profile_name=self.profile_name)
+        self.s3 = session.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        self.s3.create_bucket(Bucket=self.s3_bucket_name,
+                              CreateBucketConfiguration={
+                                  'LocationConstraint': 'eu-central-1'
+                              })
+        self.s3_bucket_conn = S3BucketConnector(end_point_url=self.s3_endpoint_url,
+                                                bucket=self.s3_bucket_name,
+                                                profile_name=self.profile_name)
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        # stopping mock s3 connection
+        self.mock_s3.stop()
+
+    def test_read_parquet_to_df_with_filters(self):
+        """
+        Tests read_parquet_to_data_frame with a date range filter on a large and a small file
+        """
+        # Test init
+        df_large = create_report()
+        df_small = create_report(rows_per_day=3, days=3)
+        with self.assertLogs() as logm:
+            self.s3_bucket_conn.write_df_to_s3_bucket(df_large, 'large.parquet', 'parquet', row_group_size=2000)
+            self.s3_bucket_conn.write_df_to_s3_bucket(df_small, 'small.parquet', 'parquet')
+
+            # Method execution
+            df_large_result = self.s3_bucket_conn.read_parquet_to_data_frame(
+                'large.parquet', filters=[('Date', '>=', '2021-04-19')])
+            df_small_result = self.s3_bucket_conn.read_parquet_to_data_frame(
+                'small.parquet', columns=['Date'], filters=[('Date', '<', '2021-04-02')])
+
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_large[df_large.Date >= '2021-04-19'].reset_index(drop=True),
+                                      df_large_result)
+        self.assertEqual(['2021-04-01'] * 3, list(df_small_result.Date))
+
+
+if __name__ == "__main__":
+    unittest.main()
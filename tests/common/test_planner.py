@@ -0,0 +1,140 @@
+""" Test execution planner methods """
+
+import unittest
+
+import boto3
+from moto import mock_s3
+
+from xetra.common.constants import ExecutionStrategy
+from xetra.common.planner import ExecutionPlanner, PlannerConfig
+from xetra.common.s3 import S3BucketConnector, S3ObjectInfo
+from xetra.common.throttle import ThrottleConfig
+
+
+class TestExecutionPlanner(unittest.TestCase):
+    """
+    Testing the ExecutionPlanner class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        # Mock s3 connection
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+
+        # Defining class arguments
+        self.s3_endpoint_url = 'https://s3.eu-central1-1.amazonaws.com'
+        self.s3_bucket_name = 'test-bucket'
+        self.profile_name = 'UnitTest'
+
+        # Create a bucket on s3
+        session = boto3.session.Session(profile_name=self.profile_name)
+        self.s3 = session.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        self.s3.create_bucket(Bucket=self.s3_bucket_name,
+                              CreateBucketConfiguration={
+                                  'LocationConstraint': 'eu-central-1'
+                              })
+        self.s3_bucket = self.s3.Bucket(self.s3_bucket_name)
+
+        self.s3_bucket_src = S3BucketConnector(end_point_url=self.s3_endpoint_url,
+                                               bucket=self.s3_bucket_name,
+                                               profile_name=self.profile_name)
+        self.mb = 1024 ** 2
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        # stopping mock s3 connection
+        self.mock_s3.stop()
+
+    def test_build_plan_small_run_in_memory(self):
+        """
+        Tests build_plan for a run that fits into the memory budget
+        """
+        # Test init
+        planner = ExecutionPlanner(self.s3_bucket_src, PlannerConfig(100, 8, 4.0, 16))
+        objects_by_date = {
+            '2021-04-16': [S3ObjectInfo('2021-04-16/a.csv', self.mb, 'e1', None)],
+            '2021-04-17': [S3ObjectInfo('2021-04-17/a.csv', self.mb, 'e2', None)]
+        }
+
+        # Method execution
+        plan = planner.build_plan(list(objects_by_date), objects_by_date)
+
+        # Test after method execution
+        self.assertEqual(ExecutionStrategy.IN_MEMORY.value, plan.strategy)
+        self.assertEqual(1, plan.max_workers)
+        self.assertEqual(2, plan.batch_days)
+        self.assertEqual(2 * self.mb, plan.total_bytes)
+
+    def test_build_plan_large_run_streaming(self):
+        """
+        Tests build_plan for a run that exceeds the memory budget
+        """
+        # Test init
+        planner = ExecutionPlanner(self.s3_bucket_src, PlannerConfig(100, 8, 4.0, 1))
+        objects_by_date = {
+            f'2021-04-{day:02d}': [S3ObjectInfo(f'2021-04-{day:02d}/{hour}.csv', 2 * self.mb, 'e', None)
+                                   for hour in range(5)]
+            for day in range(1, 31)
+        }
+
+        # Method execution
+        plan = planner.build_plan(list(objects_by_date), objects_by_date)
+
+        # Test after method execution
+        self.assertEqual(ExecutionStrategy.STREAMING.value, plan.strategy)
+        # 10 MB per day * 4.0 -> 2 days fit into 100 MB
+        self.assertEqual(2, plan.batch_days)
+        self.assertEqual(8, plan.max_workers)
+        self.assertEqual(150, plan.file_count)
+
+    def test_build_plan_workers_from_concurrency_controller(self):
+        """
+        Tests build_plan sizing the workers from the maximum limit of the source connector
+        """
+        # Test init
+        throttle_args = ThrottleConfig(initial_limit=4, min_limit=1, max_limit=16, increase_step=1,
+                                       decrease_factor=0.5, latency_factor=4.0, max_retries=3,
+                                       base_backoff_seconds=0, max_backoff_seconds=0)
+        s3_bucket_throttled = S3BucketConnector(end_point_url=self.s3_endpoint_url,
+                                                bucket=self.s3_bucket_name,
+                                                profile_name=self.profile_name,
+                                                throttle_args=throttle_args)
+        planner = ExecutionPlanner(s3_bucket_throttled, PlannerConfig(1000, 8, 4.0, 1))
+        objects_by_date = {
+            '2021-04-16': [S3ObjectInfo(f'2021-04-16/{hour}.csv', self.mb, 'e', None) for hour in range(20)]
+        }
+
+        # Method execution
+        plan = planner.build_plan(list(objects_by_date), objects_by_date)
+
+        # Test after method execution
+        self.assertEqual(ExecutionStrategy.IN_MEMORY.value, plan.strategy)
+        self.assertEqual(16, plan.max_workers)
+
+    def test_plan_lists_source_objects(self):
+        """
+        Tests plan listing the source objects with their sizes
+        """
+        # Test init
+        self.s3_bucket.put_object(Body='col1\nval1', Key='2021-04-16/a.csv')
+        planner = ExecutionPlanner(self.s3_bucket_src, PlannerConfig(100, 8, 4.0, 16))
+
+        # Method execution
+        with self.assertLogs() as logm:
+            plan = planner.plan(['2021-04-16', '2021-04-17'])
+
+        # Test after method execution
+        self.assertEqual(ExecutionStrategy.IN_MEMORY.value, plan.strategy)
+        self.assertEqual(1, plan.file_count)
+        self.assertEqual(9, plan.total_bytes)
+        self.assertEqual([], plan.objects_by_date['2021-04-17'])
+        self.assertIn('Execution plan', logm.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
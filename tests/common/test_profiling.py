@@ -0,0 +1,105 @@
+""" Test stage profiling methods """
+
+import os
+import pstats
+import tempfile
+import unittest
+
+from xetra.common.profiling import StageProfiler
+
+
+class Pipeline:
+    """
+    Pipeline with an outer and an inner stage
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def inner(self, size: int):
+        self.calls.append('inner')
+        return list(range(size))
+
+    def outer(self, size: int):
+        self.calls.append('outer')
+        return len(self.inner(size)) + len(self.inner(size))
+
+    @staticmethod
+    def static_stage(value: int):
+        return value * 2
+
+
+class TestStageProfiler(unittest.TestCase):
+    """
+    Testing the StageProfiler class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        self.tmp_dir.cleanup()
+
+    def test_instrumented_stages_write_profiles(self):
+        """
+        Tests that every stage call writes its profile files and nested stages are profiled separately
+        """
+        # Test init
+        pipeline = Pipeline()
+
+        # Method execution
+        with self.assertLogs() as logm:
+            with StageProfiler(self.tmp_dir.name) as profiler:
+                profiler.instrument(pipeline, ['outer', 'inner'])
+                profiler.instrument(Pipeline, ['static_stage'])
+                result_outer = pipeline.outer(100000)
+                result_inner = pipeline.inner(10)
+                result_static = Pipeline.static_stage(21)
+
+        # Tests after method execution
+        self.assertEqual([200000, 10, 42], [result_outer, len(result_inner), result_static])
+        self.assertEqual(['outer', 'inner', 'inner', 'inner'], pipeline.calls)
+        # the calls of the nested stage are summed up and written after the outer stage
+        self.assertEqual(['outer', 'inner', 'inner', 'static_stage'], [stage['stage'] for stage in profiler.stages])
+        self.assertEqual([1, 2, 1, 1], [stage['calls'] for stage in profiler.stages])
+        self.assertEqual(['000_outer', '001_inner', '002_inner', '003_static_stage'],
+                         sorted({file.split('.')[0] for file in os.listdir(self.tmp_dir.name)}))
+        # the outer profile is paused while the nested stage runs
+        stats_outer = pstats.Stats(os.path.join(self.tmp_dir.name, '000_outer.prof'))
+        stats_inner = pstats.Stats(os.path.join(self.tmp_dir.name, '001_inner.prof'))
+        self.assertFalse(any(function == 'inner' for _, _, function in stats_outer.stats))
+        self.assertTrue(any(function == 'inner' for _, _, function in stats_inner.stats))
+        stage_outer = profiler.stages[0]
+        self.assertLess(stage_outer['own_seconds'], stage_outer['seconds'])
+        self.assertGreaterEqual(stage_outer['peak_mb'], profiler.stages[1]['peak_mb'])
+        with open(os.path.join(self.tmp_dir.name, '000_outer.top.txt')) as file:
+            self.assertTrue(file.read().startswith('stage: outer\n'))
+        self.assertEqual(4, len(logm.output))
+
+    def test_restore_removes_wrappers(self):
+        """
+        Tests that the original methods are back after the profiler is closed
+        """
+        # Test init
+        pipeline = Pipeline()
+        static_stage = Pipeline.__dict__['static_stage']
+
+        # Method execution
+        with StageProfiler(self.tmp_dir.name) as profiler:
+            profiler.instrument(pipeline, ['outer'])
+            profiler.instrument(Pipeline, ['static_stage'])
+
+        # Tests after method execution
+        self.assertNotIn('outer', vars(pipeline))
+        self.assertIs(static_stage, Pipeline.__dict__['static_stage'])
+        self.assertEqual([], os.listdir(self.tmp_dir.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+""" Test symbol table methods """
+
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from xetra.common.local import LocalFileConnector
+from xetra.common.symbol_table import SymbolTable, SymbolTableConfig, decode_dates, encode_dates
+
+
+class TestSymbolTable(unittest.TestCase):
+    """
+    Testing the SymbolTable class and the date encoding.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.s3_bucket_meta = LocalFileConnector(root_dir=self.tmp_dir.name)
+        self.symbol_args = SymbolTableConfig(symbol_key='meta/symbol_table.csv')
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        self.tmp_dir.cleanup()
+
+    def test_encode_is_stable_across_runs(self):
+        """
+        Tests that codes are kept after writing and reading the table and new ISINs are appended
+        """
+        # Test init
+        symbol_table = SymbolTable(self.s3_bucket_meta, self.symbol_args).read()
+
+        # Method execution
+        with self.assertLogs() as logm:
+            codes_first = symbol_table.encode(pd.Series(['DE2', 'AT1', 'DE2']))
+            written = symbol_table.write()
+            symbol_table_next = SymbolTable(self.s3_bucket_meta, self.symbol_args).read()
+            written_unchanged = symbol_table_next.write()
+            codes_next = symbol_table_next.encode(pd.Series(['AT1', 'FR3', 'DE2']))
+
+        # Tests after method execution
+        self.assertEqual(np.int32, codes_first.dtype)
+        self.assertEqual([0, 1, 0], list(codes_first))
+        self.assertTrue(written)
+        self.assertFalse(written_unchanged)
+        self.assertEqual([1, 2, 0], list(codes_next))
+        self.assertEqual(['FR3', 'DE2'], list(symbol_table_next.decode(np.array([2, 0]))))
+        self.assertTrue(symbol_table_next.changed)
+
+    def test_table_without_config_is_not_persisted(self):
+        """
+        Tests that a table without SymbolTableConfig is kept in memory only
+        """
+        # Method execution
+        symbol_table = SymbolTable(self.s3_bucket_meta).read()
+        symbol_table.encode(pd.Series(['DE2']))
+
+        # Tests after method execution
+        self.assertFalse(symbol_table.write())
+        self.assertEqual(1, len(symbol_table))
+        self.assertEqual([], self.s3_bucket_meta.list_file_in_prefix('meta/'))
+
+    def test_ranks_follow_isin_order(self):
+        """
+        Tests that sorting by the ranks of the codes gives the lexicographic ISIN order
+        """
+        # Test init
+        symbol_table = SymbolTable(self.s3_bucket_meta)
+        codes = symbol_table.encode(pd.Series(['DE2', 'AT1', 'FR3', 'AT0']))
+
+        # Method execution
+        ranks = symbol_table.ranks(codes)
+
+        # Tests after method execution
+        self.assertEqual([2, 1, 3, 0], list(ranks))
+        self.assertEqual(['AT0', 'AT1', 'DE2', 'FR3'], list(symbol_table.decode(codes[np.argsort(ranks)])))
+
+    def test_encode_decode_dates(self):
+        """
+        Tests the integer date encoding keeps the order of the dates
+        """
+        # Test init
+        dates = pd.Series(['2021-04-16', '2021-03-31', '2021-04-16', '2022-01-01'])
+
+        # Method execution
+        days = encode_dates(dates)
+
+        # Tests after method execution
+        self.assertEqual(np.int32, days.dtype)
+        self.assertEqual(18733, days[0])
+        self.assertTrue(days[1] < days[0] == days[2] < days[3])
+        self.assertEqual(list(dates), list(decode_dates(days)))
+
+
+if __name__ == "__main__":
+    unittest.main()
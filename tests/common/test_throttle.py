@@ -0,0 +1,291 @@
+""" Test adaptive concurrency control methods """
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import boto3
+from botocore.exceptions import ClientError, ConnectionClosedError, IncompleteReadError
+from moto import mock_s3
+
+from xetra.common.s3 import S3BucketConnector
+from xetra.common.throttle import AdaptiveConcurrencyController, ThrottleConfig
+
+
+def slow_down_error(operation: str = 'GetObject'):
+    """
+    Throttling response as sent by S3
+    """
+    return ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Please reduce your request rate.'},
+                        'ResponseMetadata': {'HTTPStatusCode': 503}}, operation)
+
+
+class TestAdaptiveConcurrencyController(unittest.TestCase):
+    """
+    Testing the AdaptiveConcurrencyController class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.throttle_args = ThrottleConfig(initial_limit=4, min_limit=1, max_limit=6, increase_step=1,
+                                            decrease_factor=0.5, latency_factor=100.0, max_retries=3,
+                                            base_backoff_seconds=0, max_backoff_seconds=0)
+        self.controller = AdaptiveConcurrencyController(self.throttle_args)
+
+    def test_limit_increases_on_success(self):
+        """
+        Tests the additive increase after windows of successful requests at the limit up to max_limit
+        """
+        # Test init
+        def caller():
+            for _ in range(10):
+                self.controller.call(time.sleep, 0.005)
+
+        # Method execution
+        threads = [threading.Thread(target=caller) for _ in range(self.throttle_args.max_limit + 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Test after method execution
+        self.assertEqual(6, self.controller.limit)
+        self.assertEqual(80, self.controller.metrics()['requests'])
+        self.assertEqual(0, self.controller.metrics()['retries'])
+
+    def test_limit_not_increased_below_limit(self):
+        """
+        Tests that the limit doesn't grow while fewer requests than the limit are in flight
+        """
+        # Method execution
+        for _ in range(50):
+            self.controller.call(lambda: True)
+
+        # Test after method execution
+        self.assertEqual(4, self.controller.limit)
+        self.assertEqual(50, self.controller.metrics()['requests'])
+
+    def test_latency_compared_per_operation(self):
+        """
+        Tests that a slow operation isn't taken as a latency spike of a faster operation
+        """
+        # Test init
+        controller = AdaptiveConcurrencyController(self.throttle_args._replace(latency_factor=4.0))
+
+        # Method execution
+        for _ in range(3):
+            controller.call(lambda: True, operation='get_range')
+        controller.call(time.sleep, 0.01, operation='get')
+        limit_after_get = controller.limit
+        controller.call(time.sleep, 0.01, operation='get_range')
+
+        # Test after method execution
+        self.assertEqual(4, limit_after_get)
+        self.assertEqual(2, controller.limit)
+        self.assertEqual({'get', 'get_range'}, set(controller.metrics()['avg_latency_seconds']))
+
+    def test_throttling_decreases_limit_and_retries(self):
+        """
+        Tests the multiplicative decrease and the retries on throttling
+        """
+        # Test init
+        responses = [slow_down_error(), slow_down_error(), 'result']
+
+        def request():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        # Method execution
+        with self.assertLogs() as logm:
+            result = self.controller.call(request)
+
+        # Test after method execution
+        metrics = self.controller.metrics()
+        self.assertEqual('result', result)
+        self.assertEqual(2, metrics['retries'])
+        self.assertEqual(2, metrics['throttles'])
+        # decreased only once within the window
+        self.assertEqual(2, metrics['limit'])
+        self.assertEqual(0, metrics['in_flight'])
+
+    def test_sustained_throttling_keeps_decreasing_limit(self):
+        """
+        Tests that the limit decreases once per window of completed requests down to min_limit
+        """
+        # Test init
+        controller = AdaptiveConcurrencyController(self.throttle_args._replace(initial_limit=64, max_limit=64))
+        limits = []
+
+        def request():
+            raise slow_down_error()
+
+        # Method execution
+        with self.assertLogs():
+            for _ in range(20):
+                with self.assertRaises(ClientError):
+                    controller.call(request)
+                limits.append(controller.limit)
+
+        # Test after method execution
+        self.assertEqual(32, limits[0])
+        self.assertEqual(limits, sorted(limits, reverse=True))
+        self.assertEqual(1, limits[-1])
+        self.assertEqual(80, controller.metrics()['throttles'])
+
+    def test_transport_errors_are_retried(self):
+        """
+        Tests that closed connections and incomplete response bodies are retried
+        """
+        # Test init
+        responses = [ConnectionClosedError(endpoint_url='https://s3.eu-central-1.amazonaws.com'),
+                     IncompleteReadError(actual_bytes=10, expected_bytes=20), 'result']
+
+        def request():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        # Method execution
+        with self.assertLogs():
+            result = self.controller.call(request)
+
+        # Test after method execution
+        self.assertEqual('result', result)
+        self.assertEqual(2, self.controller.metrics()['retries'])
+        self.assertEqual(2, self.controller.metrics()['errors'])
+
+    def test_non_retryable_error_is_raised(self):
+        """
+        Tests that errors other than throttling and server errors are raised without retry
+        """
+        # Test init
+        def request():
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}, 'ResponseMetadata': {'HTTPStatusCode': 404}},
+                              'GetObject')
+
+        # Method execution
+        with self.assertRaises(ClientError):
+            self.controller.call(request)
+
+        # Test after method execution
+        self.assertEqual(0, self.controller.metrics()['retries'])
+        self.assertEqual(4, self.controller.limit)
+
+    def test_concurrent_requests_within_limit(self):
+        """
+        Tests that no more requests than the limit are in flight
+        """
+        # Test init
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def request():
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+        # Method execution
+        threads = [threading.Thread(target=self.controller.call, args=(request,)) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Test after method execution
+        self.assertLessEqual(in_flight[1], self.throttle_args.max_limit)
+        self.assertEqual(20, self.controller.metrics()['requests'])
+
+
+class TestS3BucketConnectorThrottling(unittest.TestCase):
+    """
+    Testing the S3BucketConnector with injected throttling.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        # Mock s3 connection
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+
+        # Defining class arguments
+        self.s3_endpoint_url = 'https://s3.eu-central1-1.amazonaws.com'
+        self.s3_bucket_name = 'test-bucket'
+        self.profile_name = 'UnitTest'
+
+        # Create a bucket on s3
+        session = boto3.session.Session(profile_name=self.profile_name)
+        self.s3 = session.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        self.s3.create_bucket(Bucket=self.s3_bucket_name,
+                              CreateBucketConfiguration={
+                                  'LocationConstraint': 'eu-central-1'
+                              })
+        self.s3_bucket = self.s3.Bucket(self.s3_bucket_name)
+        self.throttle_args = ThrottleConfig(initial_limit=4, min_limit=1, max_limit=8, increase_step=1,
+                                            decrease_factor=0.5, latency_factor=100.0, max_retries=3,
+                                            base_backoff_seconds=0, max_backoff_seconds=0)
+        self.s3_bucket_conn = S3BucketConnector(end_point_url=self.s3_endpoint_url,
+                                                bucket=self.s3_bucket_name,
+                                                profile_name=self.profile_name,
+                                                throttle_args=self.throttle_args)
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        # stopping mock s3 connection
+        self.mock_s3.stop()
+
+    def test_read_csv_with_injected_throttling(self):
+        """
+        Tests read_csv_to_data_frame succeeding after throttling responses
+        """
+        # Test init
+        key = 'test.csv'
+        self.s3_bucket.put_object(Body='col1,col2\nval1,val2', Key=key)
+        client = self.s3_bucket_conn._s3.meta.client
+        get_object = client.get_object
+        throttled = []
+
+        def throttled_get_object(**kwargs):
+            if len(throttled) < 2:
+                throttled.append(kwargs['Key'])
+                raise slow_down_error()
+            return get_object(**kwargs)
+
+        # Method execution
+        with patch.object(client, 'get_object', side_effect=throttled_get_object):
+            with self.assertLogs() as logm:
+                df_result = self.s3_bucket_conn.read_csv_to_data_frame(key)
+
+        # Test after method execution
+        metrics = self.s3_bucket_conn.request_metrics
+        self.assertEqual('val2', df_result['col2'][0])
+        self.assertEqual(2, metrics['throttles'])
+        self.assertEqual(2, metrics['retries'])
+        self.assertEqual(2, metrics['limit'])
+
+    def test_missing_key_is_not_retried(self):
+        """
+        Tests that a missing key is raised as no_such_key without retries
+        """
+        # Method execution
+        with self.assertRaises(self.s3_bucket_conn.no_such_key):
+            self.s3_bucket_conn.read_csv_to_data_frame('missing.csv')
+
+        # Test after method execution
+        self.assertEqual(0, self.s3_bucket_conn.request_metrics['retries'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+""" Test report compaction methods """
+
+import tempfile
+import unittest
+
+import pandas as pd
+
+from xetra.common.local import LocalFileConnector
+from xetra.transformers.compaction import CompactionConfig, ReportCompactor
+
+
+class TestReportCompactor(unittest.TestCase):
+    """
+    Testing the ReportCompactor class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.s3_bucket_trg = LocalFileConnector(root_dir=self.tmp_dir.name)
+        self.report_key = 'report1/xetra_daily_report1_'
+        self.compaction_args = CompactionConfig(manifest_key='report1/_manifest.json',
+                                                compacted_key='report1/compacted/xetra_report1_',
+                                                target_file_rows=5, row_group_rows=2,
+                                                unlisted_grace_seconds=0)
+        self.compactor = ReportCompactor(self.s3_bucket_trg, self.compaction_args, self.report_key,
+                                         '%Y%m%d_%H%M%S', 'Date', 'ISIN')
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        self.tmp_dir.cleanup()
+
+    def put_report(self, run: str, dates: list, price: float):
+        """
+        Writes a report file of one run with two ISINs per date
+        """
+        data_frame = pd.DataFrame({
+            'ISIN': ['DE2', 'AT1'] * len(dates),
+            'Date': [date for date in dates for _ in range(2)],
+            'closing_price_eur': [price] * 2 * len(dates)
+        })
+        key = f'{self.report_key}{run}.parquet'
+        self.s3_bucket_trg.write_df_to_s3_bucket(data_frame, key, 'parquet')
+        return key, data_frame
+
+    def test_compact_small_files(self):
+        """
+        Tests compacting small files registered in the manifest and written before the manifest existed
+        """
+        # Test init
+        self.put_report('20210413_080000', ['2021-04-12'], 1.0)
+        self.put_report('20210414_080000', ['2021-04-13'], 2.0)
+        key, data_frame = self.put_report('20210415_080000', ['2021-04-13', '2021-04-14'], 3.0)
+        self.compactor.manifest.add_files([self.compactor.manifest.file_entry(key, data_frame)])
+
+        # Method execution
+        with self.assertLogs() as logm:
+            compacted_keys = self.compactor.compact()
+
+        # Test after method execution
+        manifest = self.compactor.manifest.read()
+        df_result = pd.concat([self.s3_bucket_trg.read_parquet_to_data_frame(key) for key in compacted_keys],
+                              ignore_index=True)
+        self.assertEqual(2, len(compacted_keys))
+        self.assertEqual(compacted_keys, [entry['key'] for entry in manifest['files']])
+        self.assertEqual([], self.s3_bucket_trg.list_file_in_prefix(self.report_key))
+        self.assertEqual(['2021-04-12', '2021-04-12', '2021-04-13', '2021-04-13', '2021-04-14', '2021-04-14'],
+                         list(df_result.Date))
+        self.assertEqual(['AT1', 'DE2'], list(df_result.ISIN[:2]))
+        # the rerun of 2021-04-13 replaces the older rows
+        self.assertEqual([3.0, 3.0], list(df_result[df_result.Date == '2021-04-13'].closing_price_eur))
+        self.assertEqual({'min_date': '2021-04-12', 'max_date': '2021-04-14', 'rows': 5},
+                         {k: manifest['files'][0][k] for k in ['min_date', 'max_date', 'rows']})
+        self.assertEqual(compacted_keys[:1], self.compactor.manifest.files_for(max_date='2021-04-13'))
+
+    def test_compact_keeps_rows_of_later_worker_run(self):
+        """
+        Tests that a merged worker run written after a single process run replaces its rows
+        """
+        # Test init
+        self.put_report('20210415_080000', ['2021-04-13'], 99.0)
+        self.put_report('20210415_090000_2021-04-12_2021-04-14', ['2021-04-13'], 55.0)
+
+        # Method execution
+        with self.assertLogs():
+            compacted_keys = self.compactor.compact()
+
+        # Test after method execution
+        df_result = self.s3_bucket_trg.read_parquet_to_data_frame(compacted_keys[0])
+        self.assertEqual([55.0, 55.0], list(df_result.closing_price_eur))
+
+    def test_compact_skips_recent_unlisted_files(self):
+        """
+        Tests that a report file not yet in the manifest is kept until it is older than the grace period
+        """
+        # Test init
+        compactor = ReportCompactor(self.s3_bucket_trg, self.compaction_args._replace(unlisted_grace_seconds=3600),
+                                    self.report_key, '%Y%m%d_%H%M%S', 'Date', 'ISIN')
+        listed_key, listed_frame = self.put_report('20210414_080000', ['2021-04-12'], 1.0)
+        compactor.manifest.add_files([compactor.manifest.file_entry(listed_key, listed_frame)])
+        # written by a load that didn't add it to the manifest yet
+        running_key, running_frame = self.put_report('20210415_080000', ['2021-04-13'], 2.0)
+
+        # Method execution
+        with self.assertLogs() as logm:
+            compacted_keys = compactor.compact()
+        compactor.manifest.add_files([compactor.manifest.file_entry(running_key, running_frame)])
+
+        # Test after method execution
+        self.assertEqual([running_key], self.s3_bucket_trg.list_file_in_prefix(self.report_key))
+        self.assertEqual(compacted_keys + [running_key],
+                         [entry['key'] for entry in compactor.manifest.read()['files']])
+        self.assertEqual(['2021-04-12', '2021-04-12'],
+                         list(self.s3_bucket_trg.read_parquet_to_data_frame(compacted_keys[0]).Date))
+        self.assertTrue(any('Skipping 1 report files' in line for line in logm.output))
+
+    def test_compact_rewrites_overlapping_compacted_files(self):
+        """
+        Tests that a later run of an already compacted day replaces the compacted rows
+        """
+        # Test init
+        self.put_report('20210413_080000', ['2021-04-12', '2021-04-13'], 1.0)
+        self.compactor.compact()
+        self.put_report('20210414_080000', ['2021-04-13'], 2.0)
+
+        # Method execution
+        compacted_keys = self.compactor.compact()
+
+        # Test after method execution
+        df_result = self.s3_bucket_trg.read_parquet_to_data_frame(compacted_keys[0])
+        self.assertEqual(1, len(compacted_keys))
+        self.assertEqual(compacted_keys, self.s3_bucket_trg.list_file_in_prefix('report1/compacted/'))
+        self.assertEqual(1, len(self.compactor.manifest.read()['files']))
+        self.assertEqual(4, len(df_result))
+        self.assertEqual([1.0, 1.0, 2.0, 2.0], list(df_result.closing_price_eur))
+
+
+if __name__ == "__main__":
+    unittest.main()
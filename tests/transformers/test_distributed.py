@@ -0,0 +1,170 @@
+""" Test distributed worker methods """
+
+import unittest
+from datetime import datetime, timedelta
+
+import boto3
+import pandas as pd
+from moto import mock_s3
+
+from xetra.common.constants import LeaseStatus, MetaProcessFormat
+from xetra.common.lease import LeaseManager
+from xetra.common.meta_process import MetaProcess
+from xetra.common.s3 import S3BucketConnector
+from xetra.transformers.distributed import WorkerConfig, XetraShardWorker
+from xetra.transformers.xetra_transformers import XetraETL, XetraSourceConfig, XetraTargetConfig
+
+
+class TestXetraShardWorker(unittest.TestCase):
+    """
+    Testing the XetraShardWorker class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        # Mock s3 connection
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+
+        # Defining class arguments
+        self.s3_endpoint_url = 'https://s3.eu-central1-1.amazonaws.com'
+        self.profile_name = 'UnitTest'
+        self.meta_key = 'meta_key.csv'
+
+        # Create source and target buckets on s3
+        session = boto3.session.Session(profile_name=self.profile_name)
+        self.s3 = session.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        for bucket in ['src-bucket', 'trg-bucket']:
+            self.s3.create_bucket(Bucket=bucket,
+                                  CreateBucketConfiguration={
+                                      'LocationConstraint': 'eu-central-1'
+                                  })
+        self.src_bucket = self.s3.Bucket('src-bucket')
+
+        # Source and target configuration
+        self.dates = [(datetime.today().date() - timedelta(days=day))
+                      .strftime(MetaProcessFormat.META_DATE_FORMAT.value) for day in range(5, -1, -1)]
+        self.source_config = XetraSourceConfig(
+            src_first_extract_date=self.dates[1],
+            src_columns=['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice', 'EndPrice',
+                         'MinPrice', 'MaxPrice', 'TradedVolume'],
+            src_col_date='Date', src_col_isin='ISIN', src_col_time='Time',
+            src_col_start_price='StartPrice', src_col_min_price='MinPrice',
+            src_col_max_price='MaxPrice', src_col_traded_vol='TradedVolume')
+        self.target_config = XetraTargetConfig(
+            trg_col_isin='isin', trg_col_date='date', trg_col_op_price='opening_price_eur',
+            trg_col_clos_price='closing_price_eur', trg_col_min_price='minimum_price_eur',
+            trg_col_max_price='maximum_price_eur', trg_col_dail_trad_vol='daily_traded_volume',
+            trg_col_ch_prev_clos='change_prev_closing_%', trg_key='report1/xetra_daily_report1_',
+            trg_key_date_format='%Y%m%d_%H%M%S', trg_format='parquet')
+        self.worker_config = WorkerConfig(lease_prefix='leases/report1/', partial_prefix='partials/report1/',
+                                          shard_days=2, lease_seconds=60, settle_seconds=0)
+
+        # Source files, one hour per day
+        columns = ['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice', 'EndPrice', 'MinPrice', 'MaxPrice',
+                   'TradedVolume']
+        for day, date in enumerate(self.dates):
+            rows = [[isin, 'MN', date, '08:00', 10.0 + day + offset, 10.0, 9.0, 12.0, 100]
+                    for offset, isin in enumerate(['AT0000A0E9W5', 'DE000A0DJ6J9'])]
+            self.src_bucket.put_object(Body=pd.DataFrame(rows, columns=columns).to_csv(index=False),
+                                       Key=f'{date}/{date}_BINS_XETR08.csv')
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        # stopping mock s3 connection
+        self.mock_s3.stop()
+
+    def create_xetra_etl(self):
+        """
+        XetraETL as created by every worker process
+        """
+        return XetraETL(S3BucketConnector(self.s3_endpoint_url, 'src-bucket', self.profile_name),
+                        S3BucketConnector(self.s3_endpoint_url, 'trg-bucket', self.profile_name),
+                        self.meta_key, self.source_config, self.target_config)
+
+    def test_workers_share_shards_and_merge_once(self):
+        """
+        Tests that two workers split the shards and the merged report equals a single process run
+        """
+        # Expected result
+        xetra_etl = self.create_xetra_etl()
+        df_exp = xetra_etl.transform_report1(xetra_etl.extract())
+
+        # Test init
+        worker_a = XetraShardWorker(self.create_xetra_etl(), self.worker_config, 'worker-a')
+        worker_b = XetraShardWorker(self.create_xetra_etl(), self.worker_config, 'worker-b')
+        first_shard = worker_a.shards()[0][0]
+        # worker a holds the lease of the first shard
+        self.assertTrue(worker_a.leases.claim(worker_a._lease_key(first_shard)))
+
+        # Method execution
+        processed_b = worker_b.run()
+        merged_early = worker_b.merge()
+        processed_a = worker_a.run()
+        merged_a = worker_a.merge()
+        merged_b = worker_b.merge()
+
+        # Test after method execution
+        self.assertEqual(3, len(worker_a.shards()))
+        self.assertNotIn(first_shard, processed_b)
+        self.assertEqual([first_shard], processed_a)
+        self.assertFalse(merged_early)
+        self.assertTrue(merged_a)
+        self.assertFalse(merged_b)
+        report_keys = xetra_etl.s3_bucket_trg.list_file_in_prefix(self.target_config.trg_key)
+        df_result = xetra_etl.s3_bucket_trg.read_parquet_to_data_frame(report_keys[0])
+        pd.testing.assert_frame_equal(df_exp, df_result, check_dtype=False)
+        self.assertEqual(1, len(report_keys))
+        # partial outputs are kept until the merge of a later run
+        self.assertEqual(3, len(xetra_etl.s3_bucket_trg.list_file_in_prefix(self.worker_config.partial_prefix)))
+        # meta file was updated once with all processed days
+        _, date_list = MetaProcess.return_date_list(self.dates[1], self.meta_key, xetra_etl.s3_bucket_trg)
+        self.assertEqual([], date_list)
+
+    def test_merge_again_is_idempotent(self):
+        """
+        Tests that a second merge after the takeover of the merge lease doesn't duplicate the report
+        or the meta entries, and that the next run deletes the merged partial outputs
+        """
+        # Test init
+        worker_a = XetraShardWorker(self.create_xetra_etl(), self.worker_config, 'worker-a')
+        worker_b = XetraShardWorker(self.create_xetra_etl(), self.worker_config, 'worker-b')
+        worker_a.run()
+        worker_a.merge()
+        s3_bucket_trg = worker_a.xetra_etl.s3_bucket_trg
+        df_first = s3_bucket_trg.read_parquet_to_data_frame(
+            s3_bucket_trg.list_file_in_prefix(self.target_config.trg_key)[0])
+        # the merge lease expired before it was completed, e.g. a slow first merge
+        merge_lease = worker_a.leases.read(worker_a._lease_key('merge'))
+        LeaseManager(s3_bucket_trg, 'worker-a', -1, 0)._write(worker_a._lease_key('merge'),
+                                                               LeaseStatus.CLAIMED.value, merge_lease['created'])
+
+        # Method execution
+        merged_again = worker_b.merge()
+        # the next run processes the last day again
+        s3_bucket_trg.delete_objects([self.meta_key])
+        MetaProcess.update_meta_file(self.dates[1:-1], self.meta_key, s3_bucket_trg)
+        worker_next = XetraShardWorker(self.create_xetra_etl(), self.worker_config, 'worker-c')
+        worker_next.run()
+        worker_next.merge()
+
+        # Test after method execution
+        self.assertTrue(merged_again)
+        report_keys = s3_bucket_trg.list_file_in_prefix(self.target_config.trg_key)
+        self.assertEqual(2, len(report_keys))
+        # keys start with the time of the merge, so the later run sorts last
+        self.assertTrue(report_keys[0].endswith(f'_{worker_a.run_id}.parquet'))
+        self.assertTrue(report_keys[1].endswith(f'_{worker_next.run_id}.parquet'))
+        pd.testing.assert_frame_equal(df_first, s3_bucket_trg.read_parquet_to_data_frame(report_keys[0]))
+        df_meta = s3_bucket_trg.read_csv_to_data_frame(self.meta_key)
+        self.assertEqual(len(self.dates) - 1, len(df_meta))
+        self.assertEqual([f'{self.worker_config.partial_prefix}{worker_next.run_id}/00000.parquet'],
+                         s3_bucket_trg.list_file_in_prefix(self.worker_config.partial_prefix))
+
+
+if __name__ == "__main__":
+    unittest.main()
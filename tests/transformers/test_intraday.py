@@ -0,0 +1,131 @@
+""" Test intraday service methods """
+
+import os
+import tempfile
+import threading
+import unittest
+
+import pandas as pd
+
+from xetra.common.local import LocalFileConnector
+from xetra.transformers.intraday import IntradayConfig, XetraIntradayService
+from xetra.transformers.xetra_transformers import XetraSourceConfig, XetraTargetConfig
+
+
+class TestXetraIntradayService(unittest.TestCase):
+    """
+    Testing the XetraIntradayService class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        self.src_dir = tempfile.TemporaryDirectory()
+        self.trg_dir = tempfile.TemporaryDirectory()
+        self.s3_bucket_src = LocalFileConnector(root_dir=self.src_dir.name)
+        self.s3_bucket_trg = LocalFileConnector(root_dir=self.trg_dir.name)
+        self.columns = ['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice', 'EndPrice', 'MinPrice', 'MaxPrice',
+                        'TradedVolume']
+        source_config = XetraSourceConfig(
+            src_first_extract_date='2021-04-16', src_columns=self.columns,
+            src_col_date='Date', src_col_isin='ISIN', src_col_time='Time',
+            src_col_start_price='StartPrice', src_col_min_price='MinPrice',
+            src_col_max_price='MaxPrice', src_col_traded_vol='TradedVolume')
+        target_config = XetraTargetConfig(
+            trg_col_isin='isin', trg_col_date='date', trg_col_op_price='opening_price_eur',
+            trg_col_clos_price='closing_price_eur', trg_col_min_price='minimum_price_eur',
+            trg_col_max_price='maximum_price_eur', trg_col_dail_trad_vol='daily_traded_volume',
+            trg_col_ch_prev_clos='change_prev_closing_%', trg_key='report1/xetra_daily_report1_',
+            trg_key_date_format='%Y%m%d_%H%M%S', trg_format='parquet')
+        self.intraday_config = IntradayConfig(snapshot_key='intraday/report1/xetra_intraday_', poll_seconds=0)
+        self.service = XetraIntradayService(self.s3_bucket_src, self.s3_bucket_trg, source_config,
+                                            target_config, self.intraday_config)
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        self.src_dir.cleanup()
+        self.trg_dir.cleanup()
+
+    def put_hour(self, date: str, hour: int, rows: list):
+        """
+        Writes an hourly source file with rows of (ISIN, Time, StartPrice, MinPrice, MaxPrice, TradedVolume)
+        """
+        data_frame = pd.DataFrame([[isin, 'MN', date, time, start, start, min_price, max_price, volume]
+                                   for isin, time, start, min_price, max_price, volume in rows],
+                                  columns=self.columns)
+        path = os.path.join(self.src_dir.name, date, f'{date}_BINS_XETR{hour:02d}.csv')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data_frame.to_csv(path, index=False)
+
+    def test_run_once_folds_new_files_only(self):
+        """
+        Tests that new hourly files are folded into the running aggregates and the snapshot is updated
+        """
+        # Test init
+        date = '2021-04-16'
+        self.put_hour(date, 8, [['AT1', '08:00', 10.0, 9.5, 10.5, 100], ['DE2', '08:30', 20.0, 19.0, 21.0, 10]])
+        self.put_hour(date, 9, [['AT1', '09:00', 11.0, 9.0, 11.5, 50]])
+
+        # Method execution
+        with self.assertLogs() as logm:
+            new_files_first = self.service.run_once(date)
+            new_files_unchanged = self.service.run_once(date)
+            self.put_hour(date, 10, [['AT1', '10:00', 12.0, 11.0, 13.0, 25], ['DE2', '10:00', 18.0, 17.0, 18.5, 5]])
+            new_files_second = self.service.run_once(date)
+
+        # Tests after method execution
+        df_result = self.s3_bucket_trg.read_parquet_to_data_frame(self.service.snapshot_key(date))
+        self.assertEqual([2, 0, 1], [new_files_first, new_files_unchanged, new_files_second])
+        self.assertEqual(['AT1', 'DE2'], list(df_result.ISIN))
+        self.assertEqual([date, date], list(df_result.Date))
+        self.assertEqual([10.0, 20.0], list(df_result.opening_price_eur))
+        self.assertEqual([12.0, 18.0], list(df_result.closing_price_eur))
+        self.assertEqual([9.0, 17.0], list(df_result.minimum_price_eur))
+        self.assertEqual([13.0, 21.0], list(df_result.maximum_price_eur))
+        self.assertEqual([175, 15], list(df_result.daily_traded_volume))
+        self.assertEqual(['10:00', '10:00'], list(df_result.Time))
+        self.assertEqual(2, len(self.service.aggregates))
+
+    def test_run_once_resets_on_day_change_and_republish(self):
+        """
+        Tests that the aggregates start over on a new day and when a folded file is republished
+        """
+        # Test init
+        self.put_hour('2021-04-16', 8, [['AT1', '08:00', 10.0, 9.5, 10.5, 100]])
+        self.put_hour('2021-04-19', 8, [['AT1', '08:00', 30.0, 29.0, 31.0, 7]])
+
+        # Method execution
+        with self.assertLogs() as logm:
+            self.service.run_once('2021-04-16')
+            self.service.run_once('2021-04-19')
+            aggregates_new_day = self.service.aggregates.copy()
+            # republished with a different size, so the ETag changes
+            self.put_hour('2021-04-19', 8, [['AT1', '08:00', 30.0, 29.0, 31.0, 70]])
+            new_files_republished = self.service.run_once('2021-04-19')
+
+        # Tests after method execution
+        self.assertEqual([7], list(aggregates_new_day.daily_traded_volume))
+        self.assertEqual(1, new_files_republished)
+        self.assertEqual([70], list(self.service.aggregates.daily_traded_volume))
+
+    def test_run_forever_stops(self):
+        """
+        Tests that run_forever returns once the stop event is set
+        """
+        # Test init
+        stop_event = threading.Event()
+        stop_event.set()
+
+        # Method execution
+        with self.assertLogs() as logm:
+            self.service.run_forever(stop_event)
+
+        # Tests after method execution
+        self.assertIn('Xetra intraday service stopped.', logm.output[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
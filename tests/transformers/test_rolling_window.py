@@ -0,0 +1,104 @@
+""" Test rolling-window methods """
+
+import unittest
+
+import boto3
+import pandas as pd
+from moto import mock_s3
+
+from xetra.common.s3 import S3BucketConnector
+from xetra.transformers.rolling_window import RollingWindow, RollingWindowConfig
+
+
+class TestRollingWindow(unittest.TestCase):
+    """
+    Testing the RollingWindow class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        # Mock s3 connection
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+
+        # Defining class arguments
+        self.s3_endpoint_url = 'https://s3.eu-central1-1.amazonaws.com'
+        self.s3_bucket_name = 'test-bucket'
+        self.profile_name = 'UnitTest'
+
+        # Create a bucket on s3
+        session = boto3.session.Session(profile_name=self.profile_name)
+        self.s3 = session.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        self.s3.create_bucket(Bucket=self.s3_bucket_name,
+                              CreateBucketConfiguration={
+                                  'LocationConstraint': 'eu-central-1'
+                              })
+        self.s3_bucket_meta = S3BucketConnector(end_point_url=self.s3_endpoint_url,
+                                                bucket=self.s3_bucket_name,
+                                                profile_name=self.profile_name)
+
+        self.rolling_args = RollingWindowConfig(windows=[2, 3], volatility_window=2, volume_window=2,
+                                                state_key='meta/window_state.csv',
+                                                trg_col_moving_avg='ma_{}d',
+                                                trg_col_volatility='vol_{}d',
+                                                trg_col_volume='volume_{}d')
+        self.rolling_window = RollingWindow(self.rolling_args, 'ISIN', 'Date', 'closing_price_eur',
+                                            'daily_traded_volume')
+        self.df_report = pd.DataFrame({
+            'ISIN': ['AT1'] * 5 + ['DE2'] * 5,
+            'Date': [f'2021-04-{day:02d}' for day in range(12, 17)] * 2,
+            'closing_price_eur': [10.0, 11.0, 12.0, 11.0, 13.0, 20.0, 21.0, 19.0, 22.0, 23.0],
+            'daily_traded_volume': [100, 200, 300, 400, 500, 10, 20, 30, 40, 50]
+        })
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        # stopping mock s3 connection
+        self.mock_s3.stop()
+
+    def test_apply_incremental_equals_full_history(self):
+        """
+        Tests that applying the days one after the other with the persisted state
+        gives the same metrics as applying the whole history at once
+        """
+        # Expected result
+        df_exp, _ = self.rolling_window.apply(self.df_report,
+                                              pd.DataFrame(columns=self.rolling_window.state_columns))
+
+        # Method execution
+        state = self.rolling_window.read_state(self.s3_bucket_meta)
+        results = []
+        for date in sorted(self.df_report.Date.unique()):
+            df_day, state = self.rolling_window.apply(self.df_report[self.df_report.Date == date], state)
+            self.rolling_window.write_state(state, self.s3_bucket_meta)
+            state = self.rolling_window.read_state(self.s3_bucket_meta)
+            results.append(df_day)
+        df_result = pd.concat(results).sort_values(by=['ISIN', 'Date'], ignore_index=True)
+
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_result, check_dtype=False)
+        self.assertEqual(12.0, df_result.loc[4, 'ma_2d'])
+        self.assertLessEqual(state.groupby('ISIN').size().max(), self.rolling_window.state_size)
+
+    def test_apply_incomplete_window(self):
+        """
+        Tests that metrics are only set for complete windows
+        """
+        # Method execution
+        df_result, state = self.rolling_window.apply(self.df_report,
+                                                     pd.DataFrame(columns=self.rolling_window.state_columns))
+
+        # Test after method execution
+        self.assertTrue(pd.isna(df_result.loc[1, 'ma_3d']))
+        self.assertEqual(11.0, df_result.loc[2, 'ma_3d'])
+        self.assertEqual(300.0, df_result.loc[1, 'volume_2d'])
+        self.assertTrue(pd.isna(df_result.loc[1, 'vol_2d']))
+        self.assertEqual(3, len(state[state.ISIN == 'AT1']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,338 @@
 """ Test Xetra ETL Methods """
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import boto3
+import numpy as np
+import pandas as pd
+from moto import mock_s3
+
+from xetra.common.common_exceptions import ManifestConflictException
+from xetra.common.constants import ExecutionStrategy, MetaProcessFormat
+from xetra.common.materialization import MaterializationConfig
+from xetra.common.meta_process import MetaProcess
+from xetra.common.planner import PlannerConfig
+from xetra.common.s3 import S3BucketConnector
+from xetra.transformers.compaction import CompactionConfig
+from xetra.transformers.xetra_transformers import (COL_DATE_CODE, COL_ISIN_CODE, XetraETL, XetraSourceConfig,
+                                                   XetraTargetConfig)
+
+
+class TestXetraETLMethods(unittest.TestCase):
+    """
+    Testing the XetraETL class.
+    """
+
+    def setUp(self):
+        """
+        setting up the environment
+        """
+        # Mock s3 connection
+        self.mock_s3 = mock_s3()
+        self.mock_s3.start()
+
+        # Defining class arguments
+        self.s3_endpoint_url = 'https://s3.eu-central1-1.amazonaws.com'
+        self.s3_bucket_name_src = 'src-bucket'
+        self.s3_bucket_name_trg = 'trg-bucket'
+        self.profile_name = 'UnitTest'
+        self.meta_key = 'meta_key.csv'
+
+        # Create source and target buckets on s3
+        session = boto3.session.Session(profile_name=self.profile_name)
+        self.s3 = session.resource(service_name='s3', endpoint_url=self.s3_endpoint_url)
+        for bucket in [self.s3_bucket_name_src, self.s3_bucket_name_trg]:
+            self.s3.create_bucket(Bucket=bucket,
+                                  CreateBucketConfiguration={
+                                      'LocationConstraint': 'eu-central-1'
+                                  })
+        self.src_bucket = self.s3.Bucket(self.s3_bucket_name_src)
+        self.trg_bucket = self.s3.Bucket(self.s3_bucket_name_trg)
+        self.s3_bucket_src = S3BucketConnector(end_point_url=self.s3_endpoint_url,
+                                               bucket=self.s3_bucket_name_src,
+                                               profile_name=self.profile_name)
+        self.s3_bucket_trg = S3BucketConnector(end_point_url=self.s3_endpoint_url,
+                                               bucket=self.s3_bucket_name_trg,
+                                               profile_name=self.profile_name)
+
+        # Source and target configuration
+        self.dates = [(datetime.today().date() - timedelta(days=day))
+                      .strftime(MetaProcessFormat.META_DATE_FORMAT.value) for day in range(2, -1, -1)]
+        self.source_config = XetraSourceConfig(
+            src_first_extract_date=self.dates[1],
+            src_columns=['ISIN', 'Mnemonic', 'Date', 'Time', 'StartPrice', 'EndPrice',
+                         'MinPrice', 'MaxPrice', 'TradedVolume'],
+            src_col_date='Date', src_col_isin='ISIN', src_col_time='Time',
+            src_col_start_price='StartPrice', src_col_min_price='MinPrice',
+            src_col_max_price='MaxPrice', src_col_traded_vol='TradedVolume')
+        self.target_config = XetraTargetConfig(
+            trg_col_isin='isin', trg_col_date='date', trg_col_op_price='opening_price_eur',
+            trg_col_clos_price='closing_price_eur', trg_col_min_price='minimum_price_eur',
+            trg_col_max_price='maximum_price_eur', trg_col_dail_trad_vol='daily_traded_volume',
+            trg_col_ch_prev_clos='change_prev_closing_%', trg_key='report1/xetra_daily_report1_',
+            trg_key_date_format='%Y%m%d_%H%M%S', trg_format='parquet')
+
+        # Source files, two hours per day
+        for day, date in enumerate(self.dates):
+            for hour in ['08', '09']:
+                self.put_source_file(date, hour, 10.0 + day)
+
+    def tearDown(self):
+        """
+        Execute after unittest is done
+        """
+        # stopping mock s3 connection
+        self.mock_s3.stop()
+
+    def put_source_file(self, date: str, hour: str, price: float):
+        """
+        Writes one hourly source file with two ISINs to the source bucket
+        """
+        columns = ['ISIN', 'Mnemonic', 'SecurityDesc', 'SecurityType', 'Currency', 'SecurityID',
+                   'Date', 'Time', 'StartPrice', 'MaxPrice', 'MinPrice', 'EndPrice',
+                   'NumberOfTrades', 'TradedVolume']
+        rows = [[isin, 'MN', 'DESC', 'Common stock', 'EUR', 1, date, f'{hour}:00',
+                 price + offset, price + offset + 1, price + offset - 1, price + offset, 3, 100]
+                for offset, isin in enumerate(['AT0000A0E9W5', 'DE000A0DJ6J9'])]
+        self.src_bucket.put_object(Body=pd.DataFrame(rows, columns=columns).to_csv(index=False),
+                                   Key=f'{date}/{date}_BINS_XETR{hour}.csv')
+
+    def streaming_planner_config(self):
+        """
+        PlannerConfig that makes the planner stream the source files of setUp
+        in batches of two days with four workers
+        """
+        max_size = max(obj.size for obj in self.src_bucket.objects.all())
+        return PlannerConfig(memory_budget_mb=1, max_workers=8,
+                             memory_expansion_factor=1024 ** 2 / (4.5 * max_size), min_worker_mb=0)
+
+    def read_report(self):
+        """
+        Reads the report written by etl_report1
+        """
+        return self.s3_bucket_trg.read_parquet_to_data_frame(
+            self.s3_bucket_trg.list_file_in_prefix(self.target_config.trg_key)[0])
+
+    def test_extract_materialized_reuses_unchanged_days(self):
+        """
+        Tests that extract_materialized only aggregates days whose source files changed
+        """
+        # Test init
+        materialization_config = MaterializationConfig('materialized/report1/', 7)
+        xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                             self.source_config, self.target_config,
+                             materialization_args=materialization_config)
+        df_exp = xetra_etl.transform_report1(xetra_etl.extract())
+
+        # Method execution: first run materializes all days
+        df_first = xetra_etl.finalize_report1(xetra_etl.extract_materialized())
+        # republishing the file of the last day
+        self.put_source_file(self.dates[-1], '09', 20.0)
+        with patch.object(self.s3_bucket_src, 'read_csv_to_data_frame',
+                          wraps=self.s3_bucket_src.read_csv_to_data_frame) as read_mock:
+            df_second = xetra_etl.finalize_report1(xetra_etl.extract_materialized())
+
+        # Test after method execution
+        pd.testing.assert_frame_equal(df_exp, df_first, check_dtype=False)
+        # materialized aggregates are persisted with string keys
+        df_artifact = self.s3_bucket_trg.read_parquet_to_data_frame(
+            self.s3_bucket_trg.list_file_in_prefix(materialization_config.agg_prefix)[0])
+        self.assertEqual(['ISIN', 'Date'], list(df_artifact.columns[:2]))
+        self.assertEqual(2, read_mock.call_count)
+        self.assertTrue(all(args[0].startswith(self.dates[-1]) for args, _ in read_mock.call_args_list))
+        self.assertEqual(len(self.dates) + 1,
+                         len(self.s3_bucket_trg.list_file_in_prefix(materialization_config.agg_prefix)))
+        self.assertNotEqual(df_first['closing_price_eur'].max(), df_second['closing_price_eur'].max())
+
+    def test_etl_report1_streaming_with_workers(self):
+        """
+        Tests that a streamed run with parallel reads of the source columns
+        gives the report of an in-memory run
+        """
+        # Test init
+        xetra_etl_plain = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                                   self.source_config, self.target_config)
+        df_exp = xetra_etl_plain.transform_report1(xetra_etl_plain.extract())
+        xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                             self.source_config, self.target_config, self.streaming_planner_config())
+
+        # Method execution
+        with patch('xetra.transformers.xetra_transformers.ThreadPoolExecutor',
+                   wraps=ThreadPoolExecutor) as executor_mock, \
+                patch.object(self.s3_bucket_src, 'read_csv_to_data_frame',
+                             wraps=self.s3_bucket_src.read_csv_to_data_frame) as read_mock, \
+                patch.object(xetra_etl, 'extract', wraps=xetra_etl.extract) as extract_mock:
+            with self.assertLogs():
+                xetra_etl.etl_report1()
+
+        # Test after method execution
+        self.assertEqual(ExecutionStrategy.STREAMING.value, xetra_etl.plan.strategy)
+        self.assertEqual(4, xetra_etl.plan.max_workers)
+        self.assertEqual([self.dates[:2], self.dates[2:]], [args[0] for args, _ in extract_mock.call_args_list])
+        self.assertEqual(2, executor_mock.call_count)
+        self.assertTrue(all(kwargs == {'max_workers': 4} for _, kwargs in executor_mock.call_args_list))
+        self.assertEqual(6, read_mock.call_count)
+        self.assertTrue(all(kwargs == {'columns': self.source_config.src_columns}
+                            for _, kwargs in read_mock.call_args_list))
+        pd.testing.assert_frame_equal(df_exp, self.read_report(), check_dtype=False)
+
+    def test_etl_report1_materialized_follows_plan(self):
+        """
+        Tests that etl_report1 extracts the changed days of a materialized run in the batches of the plan
+        """
+        # Test init
+        materialization_config = MaterializationConfig('materialized/report1/', 7)
+        xetra_etl_plain = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                                   self.source_config, self.target_config)
+        df_exp = xetra_etl_plain.transform_report1(xetra_etl_plain.extract())
+        xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                             self.source_config, self.target_config, self.streaming_planner_config(),
+                             materialization_args=materialization_config)
+
+        # Method execution
+        with patch.object(xetra_etl, 'extract', wraps=xetra_etl.extract) as extract_mock:
+            with self.assertLogs():
+                xetra_etl.etl_report1()
+
+        # Test after method execution
+        self.assertEqual(ExecutionStrategy.STREAMING.value, xetra_etl.plan.strategy)
+        self.assertEqual(2, xetra_etl.plan.batch_days)
+        self.assertEqual([self.dates[:2], self.dates[2:]], [args[0] for args, _ in extract_mock.call_args_list])
+        self.assertEqual(len(self.dates),
+                         len(self.s3_bucket_trg.list_file_in_prefix(materialization_config.agg_prefix)))
+        pd.testing.assert_frame_equal(df_exp, self.read_report(), check_dtype=False)
+
+    def test_aggregate_report1_keeps_integer_keys(self):
+        """
+        Tests that aggregates are keyed by the integer codes and finalize_report1 maps them back to strings
+        """
+        # Test init
+        xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                             self.source_config, self.target_config)
+
+        # Method execution
+        df_aggregated = xetra_etl.aggregate_report1(xetra_etl.extract())
+        df_result = xetra_etl.finalize_report1(df_aggregated.iloc[::-1])
+
+        # Test after method execution
+        self.assertEqual([COL_ISIN_CODE, COL_DATE_CODE], list(df_aggregated.columns[:2]))
+        self.assertEqual(np.int32, df_aggregated[COL_ISIN_CODE].dtype)
+        self.assertEqual(['ISIN', 'Date'], list(df_result.columns[:2]))
+        self.assertEqual(['AT0000A0E9W5'] * 2 + ['DE000A0DJ6J9'] * 2, list(df_result.ISIN))
+        self.assertEqual(self.dates[1:] * 2, list(df_result.Date))
+        self.assertNotIn(COL_DATE_CODE, df_result.columns)
+
+    def test_etl_report1_processes_old_gap_only(self):
+        """
+        Tests that only a date missing in the meta file is extracted, together with its previous day
+        """
+        # Test init
+        MetaProcess.update_meta_file(self.dates[2:], self.meta_key, self.s3_bucket_trg)
+        xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                             self.source_config, self.target_config)
+
+        # Method execution
+        with patch.object(self.s3_bucket_src, 'read_csv_to_data_frame',
+                          wraps=self.s3_bucket_src.read_csv_to_data_frame) as read_mock:
+            df_result = xetra_etl.transform_report1(xetra_etl.extract())
+        xetra_etl.load(df_result)
+
+        # Test after method execution
+        self.assertEqual(self.dates[:2], xetra_etl.extract_date_list)
+        self.assertEqual(4, read_mock.call_count)
+        self.assertEqual([self.dates[1]] * 2, list(df_result.Date))
+        self.assertEqual([10.0, 9.09], list(df_result['change_prev_closing_%']))
+        self.assertEqual([], MetaProcess.return_date_plan(self.dates[1], self.meta_key,
+                                                          self.s3_bucket_trg).process_dates)
+
+    def test_etl_report1_ranges_compare_with_their_previous_trading_day(self):
+        """
+        Tests that the first day of a missing range is compared with the last trading day before it
+        and not with a day of an earlier missing range, when its previous day has no source files
+        """
+        # Test init
+        days = [(datetime.today().date() - timedelta(days=day))
+                .strftime(MetaProcessFormat.META_DATE_FORMAT.value) for day in range(5, -1, -1)]
+        # no trading on days[3], days[4:] have the source files of setUp with prices 11 and 12
+        self.src_bucket.objects.filter(Prefix=days[3]).delete()
+        for day, price in [(0, 10.0), (1, 11.0), (2, 14.0)]:
+            for hour in ['08', '09']:
+                self.put_source_file(days[day], hour, price)
+        MetaProcess.update_meta_file(days[2:4], self.meta_key, self.s3_bucket_trg)
+        xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                             self.source_config._replace(src_first_extract_date=days[1]), self.target_config)
+
+        # Method execution
+        df_result = xetra_etl.transform_report1(xetra_etl.extract())
+        # without the previous trading day the range has no previous closing price
+        with patch('xetra.transformers.xetra_transformers.MAX_NON_TRADING_DAYS', 0):
+            xetra_etl_no_lookback = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                                             self.source_config._replace(src_first_extract_date=days[1]),
+                                             self.target_config)
+        df_no_lookback = xetra_etl_no_lookback.transform_report1(xetra_etl_no_lookback.extract())
+
+        # Test after method execution
+        self.assertEqual([(days[1], days[1]), (days[4], days[5])], xetra_etl.date_plan.missing_ranges)
+        self.assertEqual(days, xetra_etl.extract_date_list)
+        self.assertEqual([days[1], days[4], days[5]] * 2, list(df_result.Date))
+        self.assertEqual([10.0, -21.43, 9.09, 9.09, -20.0, 8.33], list(df_result['change_prev_closing_%']))
+        self.assertEqual(days[:2] + days[3:], xetra_etl_no_lookback.extract_date_list)
+        self.assertEqual([10.0, 9.09, 9.09, 8.33],
+                         list(df_no_lookback['change_prev_closing_%'].dropna()))
+        self.assertEqual(2, df_no_lookback['change_prev_closing_%'].isna().sum())
+
+    def test_republished_processed_day_is_reprocessed(self):
+        """
+        Tests that a processed day within the look-back window is processed again
+        when one of its source files is republished
+        """
+        # Test init
+        materialization_config = MaterializationConfig('materialized/report1/', 7)
+        XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key, self.source_config,
+                 self.target_config, materialization_args=materialization_config).etl_report1()
+        xetra_etl_unchanged = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                                       self.source_config, self.target_config,
+                                       materialization_args=materialization_config)
+        self.put_source_file(self.dates[1], '09', 30.0)
+
+        # Method execution
+        with self.assertLogs() as logm:
+            xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key,
+                                 self.source_config, self.target_config,
+                                 materialization_args=materialization_config)
+            df_result = xetra_etl.finalize_report1(xetra_etl.extract_materialized())
+
+        # Test after method execution
+        self.assertEqual([], xetra_etl_unchanged.meta_update_list)
+        self.assertEqual([self.dates[1]], xetra_etl.meta_update_list)
+        self.assertEqual(self.dates[:2], xetra_etl.extract_date_list)
+        self.assertEqual([self.dates[1]] * 2, list(df_result.Date))
+        self.assertEqual([30.0, 31.0], list(df_result.closing_price_eur))
+
+    def test_load_updates_meta_file_when_manifest_fails(self):
+        """
+        Tests that a failed manifest update doesn't skip the meta file update
+        """
+        # Test init
+        xetra_etl = XetraETL(self.s3_bucket_src, self.s3_bucket_trg, self.meta_key, self.source_config,
+                             self.target_config, compaction_args=CompactionConfig(
+                                 'report1/_manifest.json', 'report1/compacted/xetra_report1_', 100, 10, 0))
+        df_report = xetra_etl.transform_report1(xetra_etl.extract())
+
+        # Method execution
+        with patch.object(xetra_etl.manifest, 'add_files', side_effect=ManifestConflictException):
+            with self.assertLogs() as logm:
+                xetra_etl.load(df_report)
+
+        # Test after method execution
+        self.assertEqual([], MetaProcess.return_date_plan(self.dates[1], self.meta_key,
+                                                          self.s3_bucket_trg).process_dates)
+        self.assertEqual(1, len(self.s3_bucket_trg.list_file_in_prefix(self.target_config.trg_key)))
+        self.assertTrue(any('Manifest update failed' in line for line in logm.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
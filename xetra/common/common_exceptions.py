@@ -13,4 +13,12 @@ class WrongMetaFileException(Exception):
     """
 
     """
-    pass
\ No newline at end of file
+    pass
+
+
+class ManifestConflictException(Exception):
+    """
+    Manifest conflict exception class
+    Exception is raised when the manifest was updated by another process since it was read
+    """
+    pass
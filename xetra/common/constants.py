@@ -11,6 +11,14 @@ class S3FileTypes(Enum):
     PARQUET = 'parquet'
 
 
+class StorageBackend(Enum):
+    """
+    Supported storage backends for source and target
+    """
+    S3 = 's3'
+    LOCAL = 'local'
+
+
 class MetaProcessFormat(Enum):
     """
     commonly used formats for meta process class
@@ -20,3 +28,19 @@ class MetaProcessFormat(Enum):
     META_SOURCE_DATE_COL = 'source_date'
     META_PROCESS_COL = 'datetime_of_processing'
     META_FILE_FORMAT = 'csv'
+
+
+class ExecutionStrategy(Enum):
+    """
+    Execution strategies the planner can choose from
+    """
+    IN_MEMORY = 'in_memory'
+    STREAMING = 'streaming'
+
+
+class LeaseStatus(Enum):
+    """
+    states of a lease object
+    """
+    CLAIMED = 'claimed'
+    DONE = 'done'
@@ -0,0 +1,139 @@
+"""
+Methods for planning the dates to process on numpy datetime64 arrays
+"""
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+ONE_DAY = np.timedelta64(1, 'D')
+
+
+class DatePlan(NamedTuple):
+    """
+    Dates of one run
+
+    first_date: first date to process, '2200-01-01' if there is nothing to process
+    process_dates: dates that are processed and added to the meta file,
+        the missing dates and processed dates with republished source files
+    extract_dates: process_dates and the day before every missing range,
+        which is extracted for the change to the previous closing price
+    missing_ranges: list of (first date, last date) of the consecutive dates to process
+    """
+    first_date: str
+    process_dates: list
+    extract_dates: list
+    missing_ranges: list
+
+
+def parse_dates(dates):
+    """
+    Parsing ISO dates to datetime64[D], only the unique values are parsed
+
+    :param dates: list, numpy array or Pandas Series with dates in META_DATE_FORMAT
+    :return: numpy datetime64[D] array
+    """
+    codes, uniques = pd.factorize(np.asarray(dates, dtype=object))
+    return np.asarray(uniques, dtype='datetime64[D]')[codes]
+
+
+def format_dates(days: np.ndarray):
+    """
+    :param days: numpy datetime64[D] array
+    :return: list of dates in META_DATE_FORMAT
+    """
+    return np.datetime_as_string(days, unit='D').tolist()
+
+
+def missing_dates(first_day: np.datetime64, last_day: np.datetime64, processed_days: np.ndarray):
+    """
+    :param first_day: first day of the period
+    :param last_day: last day of the period, included
+    :param processed_days: numpy datetime64[D] array of the processed days
+    :return: numpy datetime64[D] array of the days of the period that are not processed
+    """
+    days = np.arange(first_day, last_day + ONE_DAY, dtype='datetime64[D]')
+    return days[~np.isin(days, processed_days)]
+
+
+def missing_ranges(days: np.ndarray):
+    """
+    Detecting the gaps in a sorted array of days
+
+    :param days: sorted numpy datetime64[D] array
+    :return:
+        starts: first day of every range of consecutive days
+        ends: last day of every range of consecutive days
+    """
+    if days.size == 0:
+        return days, days
+    breaks = np.flatnonzero(np.diff(days) != ONE_DAY)
+    return days[np.concatenate([[0], breaks + 1])], days[np.concatenate([breaks, [days.size - 1]])]
+
+
+def range_ids(days: np.ndarray, extract_days: np.ndarray):
+    """
+    Numbering the ranges of consecutive extract days, e.g. to shift within a range only
+
+    :param days: numpy datetime64[D] array
+    :param extract_days: sorted, non-empty numpy datetime64[D] array of the extracted days
+    :return: numpy array with the number of the range of consecutive extract days of every day,
+        a day that is not extracted gets the range of the last extract day before it
+    """
+    breaks = np.concatenate([[True], np.diff(extract_days) != ONE_DAY])
+    positions = np.maximum(np.searchsorted(extract_days, days, side='right') - 1, 0)
+    return (np.cumsum(breaks) - 1)[positions]
+
+
+def batch_dates(days: np.ndarray, batch_days: int):
+    """
+    Splitting sorted days into batches of at most batch_days consecutive days
+
+    :param days: sorted numpy datetime64[D] array
+    :param batch_days: maximum number of days per batch
+    :return: list of numpy datetime64[D] arrays
+    """
+    if days.size == 0:
+        return []
+    # Position of every day within its range of consecutive days
+    breaks = np.concatenate([[True], np.diff(days) != ONE_DAY])
+    range_starts = np.maximum.accumulate(np.where(breaks, np.arange(days.size), 0))
+    splits = np.flatnonzero(breaks | ((np.arange(days.size) - range_starts) % batch_days == 0))
+    return np.split(days, splits[1:])
+
+
+def plan_process_days(process_days: np.ndarray):
+    """
+    Planning the extraction of the given days to process
+
+    :param process_days: sorted numpy datetime64[D] array of the days to process
+    :return: DatePlan
+    """
+    starts, ends = missing_ranges(process_days)
+    extract_days = np.union1d(process_days, starts - ONE_DAY)
+    return DatePlan(first_date=format_dates(process_days[:1])[0] if process_days.size else '2200-01-01',
+                    process_dates=format_dates(process_days),
+                    extract_dates=format_dates(extract_days),
+                    missing_ranges=list(zip(format_dates(starts), format_dates(ends))))
+
+
+def plan_dates(first_day: np.datetime64, today: np.datetime64, processed_days: np.ndarray):
+    """
+    Planning the dates between first_day and today that are missing in the meta file
+
+    :param first_day: the earliest day that should be processed
+    :param today: last day that should be processed
+    :param processed_days: numpy datetime64[D] array of the days in the meta file
+    :return: DatePlan
+    """
+    return plan_process_days(missing_dates(first_day, today, processed_days))
+
+
+def extend_plan(date_plan: DatePlan, days: np.ndarray):
+    """
+    Adding days to process to a plan, e.g. processed days with republished source files
+
+    :param date_plan: DatePlan
+    :param days: numpy datetime64[D] array of the additional days
+    :return: DatePlan
+    """
+    return plan_process_days(np.union1d(parse_dates(date_plan.process_dates), days))
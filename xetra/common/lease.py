@@ -0,0 +1,93 @@
+"""
+Methods for coordinating workers through lease objects
+"""
+import json
+import logging
+import time
+
+from xetra.common.storage import StorageConnector
+from xetra.common.constants import LeaseStatus
+
+
+class LeaseManager:
+    """
+    class for claiming work items through lease objects on the target bucket.
+
+    A lease is a small JSON object with its owner, status, expiry time and the time of its first
+    claim, which is kept when the lease is taken over. Claiming writes the
+    lease and reads it back after settle_seconds; the last writer keeps the lease. This needs no
+    conditional writes, and the work behind a lease has to be idempotent, since two workers
+    racing within the settle time can in rare cases both do it.
+    """
+
+    def __init__(self, s3_bucket: StorageConnector, owner: str, lease_seconds: int, settle_seconds: float):
+        """
+        :param s3_bucket: StorageConnector for the bucket with the lease objects
+        :param owner: unique id of this worker
+        :param lease_seconds: time after which a claimed but not completed lease can be taken over
+        :param settle_seconds: time between writing and verifying a claim
+        """
+        self._logger = logging.getLogger(__name__)
+        self.s3_bucket = s3_bucket
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.settle_seconds = settle_seconds
+
+    def read(self, lease_key: str):
+        """
+        Reading a lease
+
+        :param lease_key: key of the lease object
+        :return: dict with owner, status, expires and created or None if there is no lease
+        """
+        try:
+            return json.loads(self.s3_bucket.read_object(lease_key))
+        except self.s3_bucket.no_such_key:
+            return None
+
+    def _write(self, lease_key: str, status: str, created: float = None):
+        """
+        Writing a lease of this worker
+
+        :param created: time of the first claim of the lease, now if None
+        """
+        now = time.time()
+        lease = {'owner': self.owner, 'status': status, 'expires': now + self.lease_seconds,
+                 'created': created or now}
+        self.s3_bucket.write_object(json.dumps(lease).encode('utf-8'), lease_key)
+        return lease
+
+    def claim(self, lease_key: str):
+        """
+        Claiming a lease that is free, expired or already owned by this worker
+
+        :param lease_key: key of the lease object
+        :return: True if this worker holds the lease
+        """
+        lease = self.read(lease_key)
+        if lease and (lease['status'] == LeaseStatus.DONE.value
+                      or (lease['owner'] != self.owner and lease['expires'] > time.time())):
+            return False
+        self._write(lease_key, LeaseStatus.CLAIMED.value, lease.get('created') if lease else None)
+        time.sleep(self.settle_seconds)
+        lease = self.read(lease_key)
+        claimed = lease is not None and lease['owner'] == self.owner
+        self._logger.info('Lease %s %s by %s', lease_key, 'claimed' if claimed else 'lost', self.owner)
+        return claimed
+
+    def complete(self, lease_key: str):
+        """
+        Marking a lease of this worker as done, a done lease can't be claimed again
+
+        :param lease_key: key of the lease object
+        """
+        lease = self.read(lease_key)
+        return self._write(lease_key, LeaseStatus.DONE.value, lease.get('created') if lease else None)
+
+    def is_done(self, lease_key: str):
+        """
+        :param lease_key: key of the lease object
+        :return: True if the work of the lease is done
+        """
+        lease = self.read(lease_key)
+        return lease is not None and lease['status'] == LeaseStatus.DONE.value
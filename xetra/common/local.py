@@ -0,0 +1,181 @@
+"""
+Methods that access a local filesystem mirror of a bucket
+"""
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO, BytesIO
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from xetra.common.parquet_reader import read_parquet_projected
+from xetra.common.storage import StorageConnector, S3ObjectInfo
+
+TMP_FILE_PREFIX = '.tmp_'
+
+
+class LocalFileConnector(StorageConnector):
+    """
+    Class for interactions with a local directory that mirrors an S3 bucket,
+    e.g. a local NVMe copy of the deutsche-boerse-xetra-pds dataset.
+    """
+
+    def __init__(self, root_dir: str):
+        """
+        :param root_dir: directory that corresponds to the root of the bucket
+        """
+        super().__init__()
+        self.root_dir = os.path.abspath(root_dir)
+
+    @property
+    def no_such_key(self):
+        """
+        exception class raised when reading a key that doesn't exist
+        """
+        return FileNotFoundError
+
+    def _path(self, key: str):
+        """
+        local path of a key
+        """
+        return os.path.join(self.root_dir, *key.split('/'))
+
+    def _existing_path(self, key: str):
+        """
+        local path of a key that has to exist
+        """
+        path = self._path(key)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f'No such key: {key}')
+        return path
+
+    def _scan(self, prefix: str):
+        """
+        Recursively scanning the directory of the prefix with os.scandir
+
+        :param prefix: prefix that file names will be filtered with
+        :return: generator of (key, os.DirEntry) for all files containing the prefix in key
+        """
+        # Only the directory part of the prefix has to be scanned
+        prefix_dir = prefix.rsplit('/', 1)[0] if '/' in prefix else ''
+        stack = [(self._path(prefix_dir), prefix_dir)]
+        while stack:
+            path, key_dir = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        # Skipping files that are still being written
+                        if entry.name.startswith(TMP_FILE_PREFIX):
+                            continue
+                        key = f'{key_dir}/{entry.name}' if key_dir else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skipping directories that can't contain the prefix
+                            if key.startswith(prefix) or prefix.startswith(f'{key}/'):
+                                stack.append((entry.path, key))
+                        elif key.startswith(prefix):
+                            yield key, entry
+            except FileNotFoundError:
+                continue
+
+    def list_file_in_prefix(self, prefix: str):
+        """
+        list all files with prefix in the local directory
+        :param prefix: prefix that file names will be filtered with
+        :return: list of all file names containing the prefix in key, sorted like an S3 listing
+        """
+        return sorted(key for key, _ in self._scan(prefix))
+
+    def list_objects_in_prefix(self, prefix: str):
+        """
+        list all files with prefix in the local directory together with their size, ETag and modification time.
+        The ETag is derived from modification time and size, so no file content is read.
+        :param prefix: prefix that file names will be filtered with
+        :return: list of S3ObjectInfo for all files containing the prefix in key
+        """
+        objects = []
+        for key, entry in self._scan(prefix):
+            stat = entry.stat()
+            objects.append(S3ObjectInfo(key, stat.st_size, f'{stat.st_mtime_ns:x}-{stat.st_size:x}',
+                                        datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)))
+        return sorted(objects)
+
+    def read_csv_to_data_frame(self, key: str, encoding='utf-8', separator=',', columns: list = None):
+        """
+        Read memory mapped csv file and return data frame
+
+        :param key: key of the file that will be read
+        :param encoding: encoding of data inside the csv file
+        :param separator: separator of CSV file
+        :param columns: optional list of columns to keep, all columns are read if None
+        :return:
+        """
+        path = self._existing_path(key)
+        self._logger.info('Reading file %s', path)
+        return pd.read_csv(path, sep=separator, encoding=encoding, usecols=columns, memory_map=True)
+
+    def read_parquet_to_data_frame(self, key: str, columns: list = None, filters: list = None):
+        """
+        Read memory mapped parquet file and return data frame.
+        With columns or filters only the needed column chunks of the matching row groups are read.
+
+        :param key: key of the file that will be read
+        :param columns: optional list of columns to read, all columns are read if None
+        :param filters: optional list of (column, operator, value) filters,
+            see xetra.common.parquet_reader.read_parquet_projected
+        :return:
+        """
+        path = self._existing_path(key)
+        self._logger.info('Reading file %s', path)
+        if columns is None and filters is None:
+            return pq.read_table(path, memory_map=True).to_pandas()
+        return read_parquet_projected(pa.memory_map(path), columns, filters)
+
+    def read_object(self, key: str):
+        """
+        Read the raw content of a file
+
+        :param key: key of the file that will be read
+        :return: bytes
+        """
+        path = self._existing_path(key)
+        self._logger.info('Reading file %s', path)
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def delete_objects(self, keys: list):
+        """
+        Delete files, keys that don't exist are ignored like on S3
+
+        :param keys: keys of the files that will be deleted
+        """
+        for key in keys:
+            self._logger.info('Deleting file %s', self._path(key))
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        return True
+
+    def _put_object(self, out_buffer: StringIO or BytesIO, key: str):
+        """
+        Helper function for self.write_df_to_s3_bucket()
+        Writes to a temporary file first, so readers never see a partially written file.
+        :param out_buffer: StringIO | BytesIO
+        :param key: target key of the saved file
+        """
+        path = self._path(key)
+        self._logger.info('Writing file to %s', path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        body = out_buffer.getvalue()
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TMP_FILE_PREFIX)
+        try:
+            with os.fdopen(file_descriptor, 'wb') as tmp_file:
+                tmp_file.write(body)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return True
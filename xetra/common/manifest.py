@@ -0,0 +1,149 @@
+"""
+Methods for the manifest of report output files
+"""
+import json
+import logging
+import random
+import time
+import uuid
+from datetime import datetime
+import pandas as pd
+
+from xetra.common.storage import StorageConnector
+from xetra.common.constants import MetaProcessFormat
+from xetra.common.common_exceptions import ManifestConflictException
+
+# Attempts of an update that conflicts with other writers
+MANIFEST_MAX_ATTEMPTS = 5
+MANIFEST_BACKOFF_SECONDS = 0.2
+
+
+class ReportManifest:
+    """
+    class for working with the manifest of a report prefix.
+
+    The manifest is a single JSON object listing the report files with their row count and
+    min/max date and ISIN, so readers find the relevant files without listing the prefix.
+    It is replaced with one PUT (an os.replace locally), so readers see either the old or the new
+    manifest. Concurrent writers are not serialized: a write checks the version before the PUT and
+    reads the manifest back after it, and updates that lost against another writer are applied again
+    to the new version. Without conditional writes a writer overwriting a verified update in the
+    short window between PUT and read-back can't be detected, report files missing in the manifest
+    are picked up by the next compaction.
+    """
+
+    def __init__(self, s3_bucket: StorageConnector, manifest_key: str, col_date: str, col_isin: str):
+        """
+        :param s3_bucket: StorageConnector for the bucket with the report files
+        :param manifest_key: key of the manifest file
+        :param col_date: date column of the report files
+        :param col_isin: ISIN column of the report files
+        """
+        self._logger = logging.getLogger(__name__)
+        self.s3_bucket = s3_bucket
+        self.manifest_key = manifest_key
+        self.col_date = col_date
+        self.col_isin = col_isin
+
+    def read(self):
+        """
+        Reading the manifest, an empty manifest is returned if there is none yet
+
+        :return: dict with version and files
+        """
+        try:
+            return json.loads(self.s3_bucket.read_object(self.manifest_key))
+        except self.s3_bucket.no_such_key:
+            return {'version': 0, 'files': []}
+
+    def write(self, manifest: dict):
+        """
+        Publishing a new version of the manifest
+
+        :param manifest: manifest as returned by read with updated files
+        :raises ManifestConflictException: if the manifest was changed since it was read
+            or the new version was overwritten by another writer
+        """
+        if self.read()['version'] != manifest['version']:
+            raise ManifestConflictException
+        manifest = dict(manifest,
+                        version=manifest['version'] + 1,
+                        updated=datetime.today().strftime(MetaProcessFormat.META_PROCESS_DATE_FORMAT.value),
+                        writer=uuid.uuid4().hex)
+        self.s3_bucket.write_object(json.dumps(manifest, indent=1).encode('utf-8'), self.manifest_key)
+        if self.read().get('writer') != manifest['writer']:
+            raise ManifestConflictException
+        self._logger.info('Manifest %s updated to version %s', self.manifest_key, manifest['version'])
+        return manifest
+
+    def file_entry(self, key: str, data_frame: pd.DataFrame, compacted: bool = False):
+        """
+        Manifest entry of a report file
+
+        :param key: key of the report file
+        :param data_frame: content of the report file
+        :param compacted: True for files written by the compaction
+        :return: dict with the file statistics
+        """
+        return {
+            'key': key,
+            'rows': int(len(data_frame)),
+            'min_date': str(data_frame[self.col_date].min()),
+            'max_date': str(data_frame[self.col_date].max()),
+            'min_isin': str(data_frame[self.col_isin].min()),
+            'max_isin': str(data_frame[self.col_isin].max()),
+            'compacted': compacted
+        }
+
+    def update(self, change):
+        """
+        Applying a change to the files of the latest manifest version,
+        applied again to the new version on conflicts with other writers
+
+        :param change: function(list of entries) -> list of entries
+        :raises ManifestConflictException: if all MANIFEST_MAX_ATTEMPTS attempts conflicted
+        """
+        for attempt in range(MANIFEST_MAX_ATTEMPTS):
+            manifest = self.read()
+            manifest['files'] = change(manifest['files'])
+            try:
+                return self.write(manifest)
+            except ManifestConflictException:
+                if attempt == MANIFEST_MAX_ATTEMPTS - 1:
+                    raise
+                self._logger.info('Manifest %s changed by another writer, retrying', self.manifest_key)
+                time.sleep(random.uniform(0, MANIFEST_BACKOFF_SECONDS * 2 ** attempt))
+
+    def add_files(self, entries: list):
+        """
+        Adding files to the manifest
+
+        :param entries: list of entries as returned by file_entry
+        """
+        # Entries of the same keys are replaced, so publishing a file again doesn't duplicate it
+        new_keys = {entry['key'] for entry in entries}
+        return self.update(lambda files: [entry for entry in files if entry['key'] not in new_keys] + entries)
+
+    def replace_files(self, old_keys: list, entries: list):
+        """
+        Replacing files of the manifest, e.g. small files by their compacted file
+
+        :param old_keys: keys of the files that are removed from the manifest
+        :param entries: list of entries as returned by file_entry
+        """
+        old_keys = set(old_keys)
+        return self.update(lambda files: [entry for entry in files if entry['key'] not in old_keys] + entries)
+
+    def files_for(self, min_date: str = None, max_date: str = None, isin: str = None):
+        """
+        Keys of the files that can contain rows of the given date range and ISIN
+
+        :param min_date: first date of the range, unbounded if None
+        :param max_date: last date of the range, unbounded if None
+        :param isin: ISIN, any ISIN if None
+        :return: list of keys
+        """
+        return [entry['key'] for entry in self.read()['files']
+                if (min_date is None or entry['max_date'] >= min_date)
+                and (max_date is None or entry['min_date'] <= max_date)
+                and (isin is None or entry['min_isin'] <= isin <= entry['max_isin'])]
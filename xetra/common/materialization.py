@@ -0,0 +1,93 @@
+"""
+Methods for materializing per-day aggregates keyed by source fingerprints
+"""
+import hashlib
+import logging
+from typing import NamedTuple
+import pandas as pd
+
+from xetra.common.storage import StorageConnector
+from xetra.common.constants import S3FileTypes
+
+
+class MaterializationConfig(NamedTuple):
+    """
+    Configuration of the per-day aggregate materialization
+
+    agg_prefix: prefix of the materialized aggregates on the target bucket
+    lookback_days: number of days before today whose source files are checked for republished files
+        even if the days are already processed
+    """
+    agg_prefix: str
+    lookback_days: int
+
+
+class DayAggregateStore:
+    """
+    class for storing and reusing per-day aggregates.
+
+    An aggregate is stored under <agg_prefix><date>/<fingerprint>.parquet, where the fingerprint
+    is computed from the keys and ETags of the source objects of that day. A republished source
+    file changes its ETag and therefore the fingerprint, so only that day is recomputed.
+    """
+
+    def __init__(self, s3_bucket: StorageConnector, materialization_args: MaterializationConfig):
+        """
+        :param s3_bucket: StorageConnector for the bucket with the aggregates
+        :param materialization_args: MaterializationConfig
+        """
+        self._logger = logging.getLogger(__name__)
+        self.s3_bucket = s3_bucket
+        self.materialization_args = materialization_args
+
+    @staticmethod
+    def fingerprint(objects: list):
+        """
+        Fingerprint of the source objects of one day
+
+        :param objects: list of S3ObjectInfo
+        :return: hex digest independent of the listing order
+        """
+        digest = hashlib.sha256()
+        for key, etag in sorted((obj.key, obj.etag) for obj in objects):
+            digest.update(f'{key}:{etag}\n'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def artifact_key(self, date: str, fingerprint: str):
+        """
+        key of the aggregate of a day with the given source fingerprint
+        """
+        return f'{self.materialization_args.agg_prefix}{date}/{fingerprint}.{S3FileTypes.PARQUET.value}'
+
+    def list_artifacts(self):
+        """
+        Listing all stored aggregates with one listing request
+
+        :return: set of artifact keys
+        """
+        return set(self.s3_bucket.list_file_in_prefix(self.materialization_args.agg_prefix))
+
+    def changed_dates(self, objects_by_date: dict, artifacts: set):
+        """
+        Dates with a stored aggregate, but none for the current fingerprint of their source objects.
+        Dates without any stored aggregate can't be compared and are not returned.
+
+        :param objects_by_date: dict date -> list of S3ObjectInfo
+        :param artifacts: set of artifact keys as returned by list_artifacts
+        :return: list of the dates whose source files were republished
+        """
+        stored_dates = {key[len(self.materialization_args.agg_prefix):].split('/')[0] for key in artifacts}
+        return [date for date, objects in objects_by_date.items()
+                if date in stored_dates and self.artifact_key(date, self.fingerprint(objects)) not in artifacts]
+
+    def read(self, key: str):
+        """
+        Reading a stored aggregate
+        """
+        return self.s3_bucket.read_parquet_to_data_frame(key)
+
+    def write(self, data_frame: pd.DataFrame, key: str):
+        """
+        Storing an aggregate, empty aggregates are not stored
+        """
+        return self.s3_bucket.write_df_to_s3_bucket(data_frame, key, S3FileTypes.PARQUET.value)
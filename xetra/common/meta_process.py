@@ -1,13 +1,15 @@
 """
 Methods for processing meta file
 """
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import collections
 
-from xetra.common.s3 import S3BucketConnector
+from xetra.common.storage import StorageConnector
 from xetra.common.constants import MetaProcessFormat
 from xetra.common.common_exceptions import WrongMetaFileException
+from xetra.common.date_planning import ONE_DAY, format_dates, missing_dates, parse_dates, plan_dates
 
 
 class MetaProcess:
@@ -15,14 +17,17 @@ class MetaProcess:
     class for working with meta file
     """
 
+    # Methods profiled as stages with run.py --profile
+    PROFILE_STAGES = ['return_date_list', 'return_date_plan', 'update_meta_file']
+
     @staticmethod
-    def update_meta_file(extract_date_list: list, meta_key: str, s3_bucket_meta: S3BucketConnector):
+    def update_meta_file(extract_date_list: list, meta_key: str, s3_bucket_meta: StorageConnector):
         """
         Updating the meta file with processed Xetra dates and todays date as processed date
 
         :param extract_date_list: list of dates that are extracted from source
         :param meta_key: key of the file on the s3 bucket
-        :param s3_bucket_meta: S3BucketConnector for the bucket with the meta file
+        :param s3_bucket_meta: StorageConnector for the bucket with the meta file
         :return:
         """
 
@@ -42,7 +47,7 @@ class MetaProcess:
             if collections.Counter(df_old.columns) != collections.Counter(df_new.columns):
                 raise WrongMetaFileException
             df_all = pd.concat([df_old, df_new])
-        except s3_bucket_meta.session.client('s3').exceptions.NoSuchKey:
+        except s3_bucket_meta.no_such_key:
             # No meta file exists -> only the new data is used
             df_all = df_new
 
@@ -51,56 +56,76 @@ class MetaProcess:
         return True
 
     @staticmethod
-    def return_date_list(first_date: str, meta_key: str, s3_bucket_meta: S3BucketConnector):
+    def contains_dates(date_list: list, meta_key: str, s3_bucket_meta: StorageConnector):
+        """
+        Checking whether all dates are recorded in the meta file
+
+        :param date_list: list of dates in META_DATE_FORMAT
+        :param meta_key: key of the meta file on the S3 bucket
+        :param s3_bucket_meta: StorageConnector for the bucket with the meta file
+        :return: True if all dates are in the meta file
+        """
+        try:
+            df_meta = s3_bucket_meta.read_csv_to_data_frame(meta_key)
+        except s3_bucket_meta.no_such_key:
+            return not date_list
+        return bool(np.isin(parse_dates(date_list),
+                            parse_dates(df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value])).all())
+
+    @staticmethod
+    def return_date_list(first_date: str, meta_key: str, s3_bucket_meta: StorageConnector):
         """
         Creating a list of dates based on the input first_date and the already processed dates in the meta file.
 
         :param first_date: the earliest date Xetra data should be processed
         :param meta_key: key of the meta file on the S3 bucket
-        :param s3_bucket_meta: S3BucketConnector for the bucket with the meta file
+        :param s3_bucket_meta: StorageConnector for the bucket with the meta file
 
         :return:
             min_date: first date that should be processed
             return_date_list: list of all dates from mi_date till today
         """
 
-        start = datetime.strptime(first_date,
-                                  MetaProcessFormat.META_DATE_FORMAT.value)\
-                                  .date() - timedelta(days=1)
-        today = datetime.today().date()
+        start = np.datetime64(datetime.strptime(first_date, MetaProcessFormat.META_DATE_FORMAT.value).date(), 'D')
+        today = np.datetime64(datetime.today().date(), 'D')
         try:
             # If meta file exists create return_date_list using the content of the meta file
-            # Reading meta file
             df_meta = s3_bucket_meta.read_csv_to_data_frame(meta_key)
-            # Creating a list of dates from first_date untill today
-            dates = [start + timedelta(days=x) for x in range(0, (today - start).days + 1)]
-            # Creating set of all dates in meta file
-            src_dates = set(pd.to_datetime(
-              df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value]
-              ).dt.date)
-            dates_missing = set(dates[1:]) - src_dates
-            if dates_missing:
-                # Determining the earliest date that should be extracted
-                min_date = min(set(dates[1:]) - src_dates) - timedelta(days=1)
-                # Creating a list of dates from min_date untill today
-                return_min_date = (min_date + timedelta(days=1))\
-                    .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
-                return_dates = [
-                    date.strftime(MetaProcessFormat.META_DATE_FORMAT.value) \
-                        for date in dates if date >= min_date
-                        ]
+            dates_missing = missing_dates(start, today,
+                                          parse_dates(df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value]))
+            if dates_missing.size:
+                # Creating a list of dates from the day before the earliest missing date untill today
+                return_min_date = format_dates(dates_missing[:1])[0]
+                return_dates = format_dates(np.arange(dates_missing[0] - ONE_DAY, today + ONE_DAY))
             else:
                 # Setting values for the earliest date and the list of dates
                 return_dates = []
                 return_min_date = datetime(2200, 1, 1).date()\
                     .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
-        except s3_bucket_meta.session.client('s3').exceptions.NoSuchKey:
+        except s3_bucket_meta.no_such_key:
             # No meta file found -> creating a date list from first_date - 1 day untill today
             return_min_date = first_date
-            return_dates = [
-              (start + timedelta(days=x)).strftime(MetaProcessFormat.META_DATE_FORMAT.value) \
-              for x in range(0, (today - start).days + 1)
-              ]
+            return_dates = format_dates(np.arange(start - ONE_DAY, today + ONE_DAY))
         return return_min_date, return_dates
 
-    
\ No newline at end of file
+    @staticmethod
+    def return_date_plan(first_date: str, meta_key: str, s3_bucket_meta: StorageConnector):
+        """
+        Planning only the dates since first_date that are missing in the meta file.
+        Processed dates after a gap are not extracted again.
+
+        :param first_date: the earliest date Xetra data should be processed
+        :param meta_key: key of the meta file on the S3 bucket
+        :param s3_bucket_meta: StorageConnector for the bucket with the meta file
+
+        :return:
+            date_plan: DatePlan with the dates to process and to extract
+        """
+        try:
+            df_meta = s3_bucket_meta.read_csv_to_data_frame(meta_key)
+            processed_days = parse_dates(df_meta[MetaProcessFormat.META_SOURCE_DATE_COL.value])
+        except s3_bucket_meta.no_such_key:
+            # No meta file found -> all dates from first_date untill today are missing
+            processed_days = np.array([], dtype='datetime64[D]')
+        return plan_dates(parse_dates([first_date])[0], np.datetime64(datetime.today().date(), 'D'),
+                          processed_days)
@@ -0,0 +1,155 @@
+"""
+Methods for projected parquet reads with row group pruning
+"""
+import io
+import operator
+import pandas as pd
+import pyarrow.parquet as pq
+
+from xetra.common.common_exceptions import WrongFormatException
+
+# Bytes fetched from the end of a file with the first request, enough for the footer of report files
+FOOTER_FETCH_BYTES = 64 * 1024
+
+FILTER_OPERATORS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge
+}
+
+
+class RangeFile(io.RawIOBase):
+    """
+    Read-only file object on top of byte-range requests.
+
+    The first request fetches the last FOOTER_FETCH_BYTES of the file, which also returns the file
+    size, so the parquet footer is read with a single request. Every other read is one range request.
+    """
+
+    def __init__(self, fetch_range):
+        """
+        :param fetch_range: function(range_header) -> (bytes, file size) for an HTTP Range header value
+        """
+        super().__init__()
+        self._fetch_range = fetch_range
+        self._tail, self._size = fetch_range(f'bytes=-{FOOTER_FETCH_BYTES}')
+        self._tail_start = self._size - len(self._tail)
+        self._position = 0
+        self.requests = 1
+        self.bytes_fetched = len(self._tail)
+
+    @property
+    def size(self):
+        """
+        size of the file in bytes
+        """
+        return self._size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(0, offset)
+        return self._position
+
+    def read(self, size: int = -1):
+        end = self._size if size is None or size < 0 else min(self._size, self._position + size)
+        if end <= self._position:
+            return b''
+        if self._position >= self._tail_start:
+            # Served from the already fetched end of the file
+            data = self._tail[self._position - self._tail_start:end - self._tail_start]
+        else:
+            data, _ = self._fetch_range(f'bytes={self._position}-{end - 1}')
+            self.requests += 1
+            self.bytes_fetched += len(data)
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _row_group_matches(row_group, column_indices: dict, filters: list):
+    """
+    Checking the min/max statistics of a row group against the filters
+
+    :return: False if no row of the row group can match the filters
+    """
+    for column, op, value in filters:
+        statistics = row_group.column(column_indices[column]).statistics
+        if statistics is None or not statistics.has_min_max:
+            continue
+        if op == 'in':
+            if not any(statistics.min <= item <= statistics.max for item in value):
+                return False
+        elif op in ('=', '=='):
+            if not statistics.min <= value <= statistics.max:
+                return False
+        elif op == '<' and not statistics.min < value:
+            return False
+        elif op == '<=' and not statistics.min <= value:
+            return False
+        elif op == '>' and not statistics.max > value:
+            return False
+        elif op == '>=' and not statistics.max >= value:
+            return False
+    return True
+
+
+def read_parquet_projected(source, columns: list = None, filters: list = None):
+    """
+    Reading only the row groups and columns of a parquet file that are needed
+
+    :param source: file object or pyarrow NativeFile of the parquet file
+    :param columns: columns to read, all columns if None
+    :param filters: list of (column, operator, value) that all have to match, e.g.
+        [('Date', '>=', '2021-04-01'), ('ISIN', 'in', ['DE0005190003'])],
+        operators: =, ==, !=, <, <=, >, >=, in
+    :return: Pandas DataFrame
+    """
+    filters = filters or []
+    for _, op, _ in filters:
+        if op != 'in' and op not in FILTER_OPERATORS:
+            raise WrongFormatException
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.metadata
+    column_indices = {metadata.schema.column(index).name: index for index in range(metadata.num_columns)}
+
+    # Row group pruning with the min/max statistics
+    row_groups = [index for index in range(metadata.num_row_groups)
+                  if _row_group_matches(metadata.row_group(index), column_indices, filters)]
+    filter_columns = [column for column, _, _ in filters]
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + filter_columns))
+    if not row_groups:
+        return pd.DataFrame(columns=columns if columns is not None else parquet_file.schema_arrow.names)
+    data_frame = parquet_file.read_row_groups(row_groups, columns=read_columns).to_pandas()
+
+    # Row level filtering within the remaining row groups
+    if filters:
+        mask = pd.Series(True, index=data_frame.index)
+        for column, op, value in filters:
+            if op == 'in':
+                mask &= data_frame[column].isin(value)
+            else:
+                mask &= FILTER_OPERATORS[op](data_frame[column], value)
+        data_frame = data_frame[mask].reset_index(drop=True)
+    if columns is not None:
+        data_frame = data_frame.loc[:, list(columns)]
+    return data_frame
@@ -0,0 +1,116 @@
+"""
+Methods for planning the execution of an ETL run
+"""
+import logging
+import math
+from typing import NamedTuple
+
+from xetra.common.storage import StorageConnector
+from xetra.common.constants import ExecutionStrategy
+
+
+class PlannerConfig(NamedTuple):
+    """
+    Configuration of the execution planner
+
+    memory_budget_mb: memory the run may use for source data
+    max_workers: upper bound of parallel source reads, the maximum limit of the concurrency
+        controller of the source connector is used instead if it has one
+    memory_expansion_factor: ratio of DataFrame memory to CSV object size
+    min_worker_mb: source bytes one worker should at least get before another one is added
+    """
+    memory_budget_mb: int
+    max_workers: int
+    memory_expansion_factor: float
+    min_worker_mb: int
+
+
+class ExecutionPlan(NamedTuple):
+    """
+    Execution strategy picked by the planner and the inputs it was based on
+    """
+    strategy: str
+    max_workers: int
+    batch_days: int
+    file_count: int
+    total_bytes: int
+    estimated_memory: int
+    memory_budget: int
+    objects_by_date: dict
+
+
+class ExecutionPlanner:
+    """
+    class for picking an execution strategy based on S3 listing metadata
+    """
+
+    def __init__(self, s3_bucket_source: StorageConnector, planner_args: PlannerConfig):
+        """
+        :param s3_bucket_source: StorageConnector for the source bucket
+        :param planner_args: PlannerConfig with the memory budget and parallelism limits
+        """
+        self._logger = logging.getLogger(__name__)
+        self.s3_bucket_source = s3_bucket_source
+        self.planner_args = planner_args
+
+    def list_source_objects(self, date_list: list):
+        """
+        Listing the source objects of every date
+
+        :param date_list: list of dates that should be extracted
+        :return: dict of date -> list of S3ObjectInfo
+        """
+        return {date: self.s3_bucket_source.list_objects_in_prefix(date) for date in date_list}
+
+    def plan(self, date_list: list):
+        """
+        Listing the source objects and creating the execution plan for them
+
+        :param date_list: list of dates that should be extracted
+        :return: ExecutionPlan
+        """
+        execution_plan = self.build_plan(date_list, self.list_source_objects(date_list))
+        self._logger.info('Execution plan: strategy=%s, workers=%s, batch_days=%s, files=%s, '
+                          'source_bytes=%s, estimated_memory=%s, memory_budget=%s',
+                          execution_plan.strategy, execution_plan.max_workers,
+                          execution_plan.batch_days, execution_plan.file_count,
+                          execution_plan.total_bytes, execution_plan.estimated_memory,
+                          execution_plan.memory_budget)
+        return execution_plan
+
+    def build_plan(self, date_list: list, objects_by_date: dict):
+        """
+        Creating the execution plan from already listed source objects
+
+        :param date_list: list of dates that should be extracted
+        :param objects_by_date: dict of date -> list of S3ObjectInfo
+        :return: ExecutionPlan
+        """
+        factor = self.planner_args.memory_expansion_factor
+        memory_budget = self.planner_args.memory_budget_mb * 1024 ** 2
+        sizes = [obj.size for objects in objects_by_date.values() for obj in objects]
+        total_bytes = sum(sizes)
+        estimated_memory = int(total_bytes * factor)
+
+        # Only adding workers when each of them gets enough bytes to be worth a thread.
+        # A concurrency controller limits the requests in flight itself, so the pool has
+        # to allow its maximum limit
+        min_worker_bytes = max(self.planner_args.min_worker_mb * 1024 ** 2, 1)
+        worker_limit = self.s3_bucket_source.max_concurrency or self.planner_args.max_workers
+        max_workers = max(1, min(worker_limit,
+                                 len(sizes),
+                                 math.ceil(total_bytes / min_worker_bytes)))
+
+        if estimated_memory <= memory_budget:
+            return ExecutionPlan(ExecutionStrategy.IN_MEMORY.value, max_workers, max(len(date_list), 1),
+                                 len(sizes), total_bytes, estimated_memory, memory_budget,
+                                 objects_by_date)
+
+        # Streaming: a batch of days has to fit into the budget ...
+        largest_day = max(sum(obj.size for obj in objects) for objects in objects_by_date.values())
+        batch_days = max(1, int(memory_budget // max(largest_day * factor, 1)))
+        # ... and so do the files that are read at the same time
+        max_workers = max(1, min(max_workers, int(memory_budget // max(max(sizes) * factor, 1))))
+        return ExecutionPlan(ExecutionStrategy.STREAMING.value, max_workers, batch_days,
+                             len(sizes), total_bytes, estimated_memory, memory_budget,
+                             objects_by_date)
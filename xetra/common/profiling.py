@@ -0,0 +1,236 @@
+"""
+Methods for on-demand profiling of pipeline stages
+"""
+import collections
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# Interval of the stack sampler for the collapsed stacks
+SAMPLE_INTERVAL_SECONDS = 0.005
+# Frames kept per traceback of an allocation site, the statistics group by the innermost frame
+TRACEMALLOC_FRAMES = 1
+SAMPLER_THREAD_NAME = 'xetra-stack-sampler'
+
+
+class StackSampler(threading.Thread):
+    """
+    class for sampling the stacks of all threads into collapsed stacks.
+
+    Every sample adds one count to the stack 'thread;outer function;...;inner function',
+    which is the input format of flamegraph.pl and speedscope. The sampler also keeps the
+    highest traced memory of its samples.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        """
+        :param interval: time between two samples
+        """
+        super().__init__(name=SAMPLER_THREAD_NAME, daemon=True)
+        self.interval = interval
+        self.counts = collections.Counter()
+        self.peak = tracemalloc.get_traced_memory()[0]
+        self.paused = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        thread_names = {}
+        while not self._stop_event.wait(self.interval):
+            if self.paused.is_set():
+                continue
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[0])
+            for thread in threading.enumerate():
+                thread_names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                # The samplers of all stages are skipped
+                if thread_names.get(thread_id) == SAMPLER_THREAD_NAME:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f'{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})')
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        """
+        Stopping the sampler and waiting for the last sample
+        """
+        self._stop_event.set()
+        self.join()
+
+
+class StageProfiler:
+    """
+    class for profiling the stages of a run.
+
+    instrument() replaces methods of an object or class by wrappers that run the method with
+    cProfile, tracemalloc and a stack sampler and write per stage:
+    <nnn>_<stage>.prof (pstats dump), <nnn>_<stage>.collapsed (collapsed stacks for flamegraphs)
+    and <nnn>_<stage>.top.txt (peak memory, top allocation sites and top functions by cumulative time).
+    cProfile covers the calling thread, the stack sampler covers all threads.
+    Nothing is wrapped without instrument(), so a run without profiling has no overhead.
+    Stages called within another stage are profiled separately: the cProfile and the stack sampler
+    of the outer stage are paused while the inner stage runs, so the outer profile only has the
+    own work of the outer stage. seconds is the wall time including nested stages, own_seconds
+    excludes them. The peak memory of the outer stage includes the nested stages.
+    The calls of a nested stage within one outermost stage are summed up in one profile, written
+    with the outermost stage once tracemalloc is stopped, as pstats is slow while tracing.
+    The peak of a nested stage is sampled, and allocation sites are only written for outermost
+    stages, as tracemalloc snapshots are slow.
+    """
+
+    def __init__(self, output_dir: str, top_allocations: int = 25):
+        """
+        :param output_dir: directory of the profile files
+        :param top_allocations: number of allocation sites written per stage
+        """
+        self._logger = logging.getLogger(__name__)
+        self.output_dir = output_dir
+        self.top_allocations = top_allocations
+        self.stages = []
+        self._active = []
+        self._nested = {}
+        self._started = 0
+        self._stop_tracing = False
+        self._originals = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.restore()
+
+    def instrument(self, target, method_names: list):
+        """
+        Wrapping methods of an object or a class with the stage profiling
+
+        :param target: object or class
+        :param method_names: names of the methods, used as stage names
+        """
+        for name in method_names:
+            # Static methods are wrapped as the plain function and stay static methods
+            original = target.__dict__[name] if isinstance(target, type) else getattr(target, name)
+            function = original.__func__ if isinstance(original, staticmethod) else original
+            wrapper = self.wrap(name, function)
+            setattr(target, name, staticmethod(wrapper) if isinstance(original, staticmethod) else wrapper)
+            self._originals.append((target, name, original))
+        return target
+
+    def restore(self):
+        """
+        Restoring all instrumented methods
+        """
+        for target, name, original in reversed(self._originals):
+            if isinstance(target, type):
+                setattr(target, name, original)
+            else:
+                delattr(target, name)
+        self._originals = []
+
+    def wrap(self, stage: str, function):
+        """
+        :return: function running function as profiled stage
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return self.run_stage(stage, function, *args, **kwargs)
+        return wrapper
+
+    def _new_record(self):
+        """
+        Summed up measurements of the calls of a stage
+        """
+        self._started += 1
+        return {'number': self._started - 1, 'profile': cProfile.Profile(), 'counts': collections.Counter(),
+                'calls': 0, 'seconds': 0.0, 'own_seconds': 0.0, 'peak': 0}
+
+    def run_stage(self, stage: str, function, *args, **kwargs):
+        """
+        Running function with cProfile, tracemalloc and the stack sampler,
+        pausing the profile of the stage that called it
+
+        :param stage: name of the stage
+        :param function: the stage
+        :return: the result of function
+        """
+        paused = time.perf_counter()
+        outer = self._active[-1] if self._active else None
+        if outer:
+            outer['record']['profile'].disable()
+            outer['sampler'].paused.set()
+            record = self._nested.get(stage) or self._nested.setdefault(stage, self._new_record())
+        else:
+            # The peak of tracemalloc covers the outermost stage if it starts the tracing,
+            # nested stages use the peak of their samples
+            self._stop_tracing = not tracemalloc.is_tracing()
+            if self._stop_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            snapshot_start = tracemalloc.take_snapshot()
+            record = self._new_record()
+        current = {'record': record, 'sampler': StackSampler(), 'nested_seconds': 0.0, 'nested_peak': 0}
+        self._active.append(current)
+        start = time.perf_counter()
+        current['sampler'].start()
+        record['profile'].enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record['profile'].disable()
+            current['sampler'].stop()
+            seconds = time.perf_counter() - start
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            peak = max(current['sampler'].peak, current['nested_peak'], traced)
+            self._active.pop()
+            record['counts'].update(current['sampler'].counts)
+            record['calls'] += 1
+            record['seconds'] += seconds
+            record['own_seconds'] += seconds - current['nested_seconds']
+            if outer:
+                record['peak'] = max(record['peak'], peak)
+                outer['nested_peak'] = max(outer['nested_peak'], peak)
+                # Time of this stage is not part of the outer stage
+                outer['nested_seconds'] += time.perf_counter() - paused
+                outer['sampler'].paused.clear()
+                outer['record']['profile'].enable()
+            else:
+                record['peak'] = max(peak, traced_peak) if self._stop_tracing else peak
+                # Allocation sites by memory still held at the end of the stage
+                filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+                statistics = tracemalloc.take_snapshot().filter_traces(filters)\
+                    .compare_to(snapshot_start.filter_traces(filters), 'lineno')
+                del snapshot_start
+                if self._stop_tracing:
+                    tracemalloc.stop()
+                self._write_stage(stage, record, statistics)
+                for nested_stage, nested_record in self._nested.items():
+                    self._write_stage(nested_stage, nested_record, [])
+                self._nested = {}
+
+    def _write_stage(self, stage, record, statistics):
+        seconds, peak = record['seconds'], record['peak']
+        # Numbered in call order, nested stages by their first call
+        prefix = os.path.join(self.output_dir, f'{record["number"]:03d}_{stage}')
+        record['profile'].dump_stats(f'{prefix}.prof')
+        with open(f'{prefix}.collapsed', 'w') as file:
+            for stack, count in sorted(record['counts'].items()):
+                file.write(f'{stack} {count}\n')
+        with open(f'{prefix}.top.txt', 'w') as file:
+            file.write(f'stage: {stage}\ncalls: {record["calls"]}\nseconds: {seconds:.3f}\n'
+                       f'own_seconds: {record["own_seconds"]:.3f}\npeak_mb: {peak / 2 ** 20:.1f}\n\n')
+            for statistic in statistics[:self.top_allocations]:
+                file.write(f'{statistic}\n')
+            file.write('\n')
+            pstats.Stats(record['profile'], stream=file).sort_stats(pstats.SortKey.CUMULATIVE)\
+                .print_stats(self.top_allocations)
+        self.stages.append({'stage': stage, 'calls': record['calls'], 'seconds': seconds,
+                            'own_seconds': record['own_seconds'], 'peak_mb': peak / 2 ** 20, 'prefix': prefix})
+        self._logger.info('Profiled stage %s: %s calls, %.3f s, peak traced memory %.1f MB, written to %s.*',
+                          stage, record['calls'], seconds, peak / 2 ** 20, prefix)
@@ -2,87 +2,178 @@
 Methods that access S3
 """
 import boto3
-import logging
+from botocore.config import Config
 from io import StringIO, BytesIO
 import pandas as pd
 
-from xetra.common.constants import S3FileTypes
-from xetra.common.common_exceptions import WrongFormatException
+from xetra.common.parquet_reader import RangeFile, read_parquet_projected
+from xetra.common.storage import StorageConnector, S3ObjectInfo
+from xetra.common.throttle import AdaptiveConcurrencyController, ThrottleConfig
 
 
-class S3BucketConnector:
+class S3BucketConnector(StorageConnector):
     """
     Class for S3 interactions.
     """
 
-    def __init__(self, end_point_url: str, bucket: str, profile_name: str):
+    def __init__(self, end_point_url: str, bucket: str, profile_name: str, throttle_args: ThrottleConfig = None):
         """
         :param end_point_url: end point url to s3 bucket
         :param bucket: s3 bucket name we will use
         :param profile_name: aws profile in order to access S3 bucket
+        :param throttle_args: optional ThrottleConfig, requests are sent without concurrency control if None
         """
-        self._logger = logging.getLogger(__name__)
+        super().__init__()
         self.end_point_url = end_point_url
         self.session = boto3.session.Session(profile_name=profile_name)
-        self._s3 = self.session.resource(service_name='s3', endpoint_url=end_point_url)
+        if throttle_args:
+            # Retries are done by the controller, so it sees every throttling response,
+            # it also retries the transport errors botocore would retry, see RETRY_EXCEPTIONS
+            self._controller = AdaptiveConcurrencyController(throttle_args)
+            self._s3 = self.session.resource(service_name='s3', endpoint_url=end_point_url,
+                                             config=Config(retries={'total_max_attempts': 1}))
+        else:
+            self._controller = None
+            self._s3 = self.session.resource(service_name='s3', endpoint_url=end_point_url)
         self._bucket = self._s3.Bucket(bucket)
 
+    @property
+    def request_metrics(self):
+        """
+        current limit, retry and error counts of the concurrency controller
+        """
+        return self._controller.metrics() if self._controller else {}
+
+    @property
+    def max_concurrency(self):
+        """
+        maximum limit of concurrent requests of the concurrency controller, None without controller
+        """
+        return self._controller.throttle_args.max_limit if self._controller else None
+
+    def _request(self, operation: str, function, *args, **kwargs):
+        """
+        Sending a request through the concurrency controller if there is one
+
+        :param operation: type of the request, the controller averages latencies per type
+        """
+        if self._controller:
+            return self._controller.call(function, *args, operation=operation, **kwargs)
+        return function(*args, **kwargs)
+
+    def _get_object_body(self, key: str):
+        """
+        Downloading the content of an object, the body is read within the request
+        """
+        return self._s3.meta.client.get_object(Bucket=self._bucket.name, Key=key)['Body'].read()
+
+    def _get_object_range(self, key: str, range_header: str):
+        """
+        Downloading a byte range of an object
+
+        :param key: key of the object
+        :param range_header: HTTP Range header value, e.g. 'bytes=0-99' or 'bytes=-100'
+        :return: (bytes, size of the whole object)
+        """
+        response = self._s3.meta.client.get_object(Bucket=self._bucket.name, Key=key, Range=range_header)
+        body = response['Body'].read()
+        # 'bytes 0-99/1000', missing if the whole object was returned
+        content_range = response.get('ContentRange')
+        return body, int(content_range.rsplit('/', 1)[1]) if content_range else len(body)
+
+    @property
+    def no_such_key(self):
+        """
+        exception class raised when reading a key that doesn't exist
+        """
+        return self._s3.meta.client.exceptions.NoSuchKey
+
     def list_file_in_prefix(self, prefix: str):
         """
         list all files with prefix on S3 bucket
         :param prefix: prefix that s3 file names will be filtered with
         :return: list of all file name contaning the prefix in key
         """
-        return [obj.key for obj in self._bucket.objects.filter(Prefix=prefix)]
+        return [obj.key for obj in self._request('list', list, self._bucket.objects.filter(Prefix=prefix))]
 
-    def read_csv_to_data_frame(self, key: str, encoding='utf-8', separator=','):
+    def list_objects_in_prefix(self, prefix: str):
+        """
+        list all objects with prefix on S3 bucket together with their size, ETag and modification time
+        :param prefix: prefix that s3 file names will be filtered with
+        :return: list of S3ObjectInfo for all objects containing the prefix in key
+        """
+        return [S3ObjectInfo(obj.key, obj.size, obj.e_tag.strip('"'), obj.last_modified)
+                for obj in self._request('list', list, self._bucket.objects.filter(Prefix=prefix))]
+
+    def read_csv_to_data_frame(self, key: str, encoding='utf-8', separator=',', columns: list = None):
         """
         Read csv file from S3 and return data frame
 
         :param key:key of the file that will be read
         :param encoding: encoding of data inside the csv file
         :param separator: separator of CSV file
+        :param columns: optional list of columns to keep, all columns are read if None
         :return:
         """
         self._logger.info('Reading file %s/%s/%s', self.end_point_url, self._bucket.name, key)
-        csv_obj = self._bucket.Object(key=key).get()['Body'].read().decode(encoding)
+        # The low level client is thread safe, resource objects are not
+        csv_obj = self._request('get', self._get_object_body, key).decode(encoding)
         data = StringIO(csv_obj)
-        data_frame = pd.read_csv(data, sep=separator)
+        data_frame = pd.read_csv(data, sep=separator, usecols=columns)
         return data_frame
 
-    def write_df_to_s3_bucket(self, data_frame: pd.DataFrame, key: str, file_format: str):
+    def read_parquet_to_data_frame(self, key: str, columns: list = None, filters: list = None):
         """
-        Writing a Pandas data frame to S3
-        supports the following formats: .csv, .parquet
+        Read parquet file from S3 and return data frame.
+        With columns or filters only the footer and the needed column chunks of the
+        matching row groups are fetched with byte-range requests.
 
-        :param data_frame: Pandas data frame that should be written
-        :param key: target key of the saved file
-        :param file_format: format of the saved file
+        :param key: key of the file that will be read
+        :param columns: optional list of columns to read, all columns are read if None
+        :param filters: optional list of (column, operator, value) filters,
+            see xetra.common.parquet_reader.read_parquet_projected
         :return:
         """
-        if data_frame.empty:
-            self._logger.info('The data frame is empty! No file will be written')
-            return None
+        self._logger.info('Reading file %s/%s/%s', self.end_point_url, self._bucket.name, key)
+        if columns is None and filters is None:
+            parquet_obj = self._request('get', self._get_object_body, key)
+            return pd.read_parquet(BytesIO(parquet_obj), engine='pyarrow')
+        range_file = RangeFile(
+            lambda range_header: self._request('get_range', self._get_object_range, key, range_header))
+        data_frame = read_parquet_projected(range_file, columns, filters)
+        self._logger.info('Fetched %s of %s bytes with %s requests', range_file.bytes_fetched,
+                          range_file.size, range_file.requests)
+        return data_frame
+
+    def read_object(self, key: str):
+        """
+        Read the raw content of a file from S3
 
-        if file_format == S3FileTypes.CSV.value:
-            out_buffer = StringIO()
-            data_frame.to_csv(out_buffer, index=False)
-            return self.__put_object(out_buffer, key)
+        :param key: key of the file that will be read
+        :return: bytes
+        """
+        self._logger.info('Reading file %s/%s/%s', self.end_point_url, self._bucket.name, key)
+        return self._request('get', self._get_object_body, key)
 
-        elif file_format == S3FileTypes.PARQUET.value:
-            out_buffer = BytesIO()
-            data_frame.to_parquet(out_buffer, engine='pyarrow', index=False)
-            return self.__put_object(out_buffer, key)
+    def delete_objects(self, keys: list):
+        """
+        Delete files from S3, in chunks of the 1000 keys a request allows
 
-        self._logger.info('The file format %s isnt supported to be written to S3', file_format)
-        raise WrongFormatException
+        :param keys: keys of the files that will be deleted
+        """
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            self._logger.info('Deleting %s files from %s/%s', len(chunk), self.end_point_url, self._bucket.name)
+            self._request('delete', self._bucket.delete_objects,
+                          Delete={'Objects': [{'Key': key} for key in chunk]})
+        return True
 
-    def __put_object(self, out_buffer: StringIO or BytesIO, key: str):
+    def _put_object(self, out_buffer: StringIO or BytesIO, key: str):
         """
-        Helper function for self.write_df_to_s3()
+        Helper function for self.write_df_to_s3_bucket()
         :param out_buffer: StringIO | BytesIO
         :param key: target key of the saved file
         """
         self._logger.info('Writing file to %s/%s/%s', self.end_point_url, self._bucket.name, key)
-        self._bucket.put_object(Body=out_buffer.getvalue(), Key=key)
+        self._request('put', self._bucket.put_object, Body=out_buffer.getvalue(), Key=key)
         return True
@@ -0,0 +1,155 @@
+"""
+Storage backend interface shared by the S3 and the local filesystem connector
+"""
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from io import StringIO, BytesIO
+from typing import NamedTuple
+import pandas as pd
+
+from xetra.common.constants import S3FileTypes
+from xetra.common.common_exceptions import WrongFormatException
+
+
+class S3ObjectInfo(NamedTuple):
+    """
+    Listing metadata of a single object on the S3 bucket
+    """
+    key: str
+    size: int
+    etag: str
+    last_modified: datetime
+
+
+class StorageConnector(ABC):
+    """
+    Base class for storage backends.
+    Keys are '/' separated paths relative to the bucket or root directory.
+    """
+
+    def __init__(self):
+        # Logging with the module name of the concrete connector
+        self._logger = logging.getLogger(type(self).__module__)
+
+    @property
+    @abstractmethod
+    def no_such_key(self):
+        """
+        exception class raised when reading a key that doesn't exist
+        """
+
+    @property
+    def request_metrics(self):
+        """
+        metrics of the requests sent by the connector, empty if not collected
+        """
+        return {}
+
+    @property
+    def max_concurrency(self):
+        """
+        upper bound of concurrent requests set by the connector, None if it doesn't limit them
+        """
+        return None
+
+    @abstractmethod
+    def list_file_in_prefix(self, prefix: str):
+        """
+        list all files with prefix
+        :param prefix: prefix that file names will be filtered with
+        :return: list of all file names containing the prefix in key
+        """
+
+    @abstractmethod
+    def list_objects_in_prefix(self, prefix: str):
+        """
+        list all objects with prefix together with their size and ETag
+        :param prefix: prefix that file names will be filtered with
+        :return: list of S3ObjectInfo for all objects containing the prefix in key
+        """
+
+    @abstractmethod
+    def read_csv_to_data_frame(self, key: str, encoding='utf-8', separator=',', columns: list = None):
+        """
+        Read csv file and return data frame
+
+        :param key: key of the file that will be read
+        :param encoding: encoding of data inside the csv file
+        :param separator: separator of CSV file
+        :param columns: optional list of columns to keep, all columns are read if None
+        """
+
+    @abstractmethod
+    def read_parquet_to_data_frame(self, key: str, columns: list = None, filters: list = None):
+        """
+        Read parquet file and return data frame
+
+        :param key: key of the file that will be read
+        :param columns: optional list of columns to read, all columns are read if None
+        :param filters: optional list of (column, operator, value) filters,
+            see xetra.common.parquet_reader.read_parquet_projected
+        """
+
+    @abstractmethod
+    def read_object(self, key: str):
+        """
+        Read the raw content of a file
+
+        :param key: key of the file that will be read
+        :return: bytes
+        """
+
+    @abstractmethod
+    def delete_objects(self, keys: list):
+        """
+        Delete files
+
+        :param keys: keys of the files that will be deleted
+        """
+
+    @abstractmethod
+    def _put_object(self, out_buffer: StringIO or BytesIO, key: str):
+        """
+        Helper function for self.write_df_to_s3_bucket()
+        :param out_buffer: StringIO | BytesIO
+        :param key: target key of the saved file
+        """
+
+    def write_object(self, body: bytes, key: str):
+        """
+        Write raw content to a file, replacing it atomically if it exists
+
+        :param body: content of the file
+        :param key: target key of the saved file
+        """
+        return self._put_object(BytesIO(body), key)
+
+    def write_df_to_s3_bucket(self, data_frame: pd.DataFrame, key: str, file_format: str,
+                              row_group_size: int = None):
+        """
+        Writing a Pandas data frame to the storage
+        supports the following formats: .csv, .parquet
+
+        :param data_frame: Pandas data frame that should be written
+        :param key: target key of the saved file
+        :param file_format: format of the saved file
+        :param row_group_size: maximum rows per parquet row group, pyarrow default if None
+        :return:
+        """
+        if data_frame.empty:
+            self._logger.info('The data frame is empty! No file will be written')
+            return None
+
+        if file_format == S3FileTypes.CSV.value:
+            out_buffer = StringIO()
+            data_frame.to_csv(out_buffer, index=False)
+            return self._put_object(out_buffer, key)
+
+        elif file_format == S3FileTypes.PARQUET.value:
+            out_buffer = BytesIO()
+            data_frame.to_parquet(out_buffer, engine='pyarrow', index=False, row_group_size=row_group_size)
+            return self._put_object(out_buffer, key)
+
+        self._logger.info('The file format %s isnt supported to be written to S3', file_format)
+        raise WrongFormatException
@@ -0,0 +1,137 @@
+"""
+Methods for integer encoding of ISINs and dates
+"""
+import logging
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+from xetra.common.constants import MetaProcessFormat
+from xetra.common.storage import StorageConnector
+
+SYMBOL_COL_CODE = 'code'
+
+
+class SymbolTableConfig(NamedTuple):
+    """
+    Configuration of the ISIN symbol table
+
+    symbol_key: key of the symbol table file, stored next to the meta file
+    """
+    symbol_key: str
+
+
+def encode_dates(dates: pd.Series):
+    """
+    Encoding ISO date strings as int32 days since 1970-01-01
+
+    :param dates: Pandas Series with dates in META_DATE_FORMAT
+    :return: numpy int32 array
+    """
+    # Few distinct days per frame, so only the unique strings are parsed
+    codes, uniques = pd.factorize(dates)
+    days = np.asarray(uniques, dtype='datetime64[D]').astype(np.int32)
+    return days[codes]
+
+
+def decode_dates(days: np.ndarray):
+    """
+    Decoding int32 days since 1970-01-01 to ISO date strings
+
+    :param days: numpy array as returned by encode_dates
+    :return: numpy object array with dates in META_DATE_FORMAT
+    """
+    codes, uniques = pd.factorize(days)
+    strings = np.datetime_as_string(np.asarray(uniques, dtype=np.int64).astype('datetime64[D]'), unit='D')
+    return strings.astype(object)[codes]
+
+
+class SymbolTable:
+    """
+    class for mapping ISINs to int32 codes.
+
+    Codes are assigned in order of first appearance and never change, so the table is
+    persisted next to the meta file and only grows with new ISINs.
+    """
+
+    def __init__(self, s3_bucket: StorageConnector, symbol_args: SymbolTableConfig = None,
+                 col_isin: str = 'ISIN'):
+        """
+        :param s3_bucket: StorageConnector for the bucket with the meta file
+        :param symbol_args: SymbolTableConfig, the table is not persisted if None
+        :param col_isin: ISIN column of the symbol table file
+        """
+        self._logger = logging.getLogger(__name__)
+        self.s3_bucket = s3_bucket
+        self.symbol_args = symbol_args
+        self.col_isin = col_isin
+        self._index = pd.Index([], dtype=object)
+        self.changed = False
+
+    def __len__(self):
+        return len(self._index)
+
+    def read(self):
+        """
+        Reading the persisted symbol table, the table stays empty if there is none yet
+        """
+        if not self.symbol_args:
+            return self
+        try:
+            data_frame = self.s3_bucket.read_csv_to_data_frame(self.symbol_args.symbol_key)
+        except self.s3_bucket.no_such_key:
+            self._logger.info('No symbol table found, starting with an empty one.')
+            return self
+        isins = data_frame.sort_values(by=[SYMBOL_COL_CODE])[self.col_isin]
+        self._index = pd.Index(isins.to_numpy(dtype=object))
+        self.changed = False
+        return self
+
+    def write(self):
+        """
+        Writing the symbol table next to the meta file if new ISINs were added
+        """
+        if not self.symbol_args or not self.changed:
+            return False
+        data_frame = pd.DataFrame({self.col_isin: self._index.to_numpy(),
+                                   SYMBOL_COL_CODE: np.arange(len(self._index), dtype=np.int32)})
+        self.s3_bucket.write_df_to_s3_bucket(data_frame, self.symbol_args.symbol_key,
+                                             MetaProcessFormat.META_FILE_FORMAT.value)
+        self.changed = False
+        return True
+
+    def encode(self, isins: pd.Series):
+        """
+        Encoding ISINs, unknown ISINs are added to the table
+
+        :param isins: Pandas Series with ISINs
+        :return: numpy int32 array
+        """
+        codes = self._index.get_indexer(isins)
+        missing = codes < 0
+        if missing.any():
+            new_isins = pd.unique(isins[missing])
+            self._index = self._index.append(pd.Index(new_isins, dtype=object))
+            self.changed = True
+            codes[missing] = self._index.get_indexer(isins[missing])
+        return codes.astype(np.int32)
+
+    def decode(self, codes: np.ndarray):
+        """
+        Decoding int32 codes to ISINs
+
+        :param codes: numpy array as returned by encode
+        :return: numpy object array with ISINs
+        """
+        return self._index.to_numpy(dtype=object)[codes]
+
+    def ranks(self, codes: np.ndarray):
+        """
+        Ranks of the ISINs of codes in lexicographic ISIN order, for sorting by ISIN on the codes
+
+        :param codes: numpy array as returned by encode
+        :return: numpy int32 array
+        """
+        ranks = np.empty(len(self._index), dtype=np.int32)
+        ranks[np.argsort(self._index.to_numpy(dtype=object), kind='stable')] = np.arange(len(self._index))
+        return ranks[codes]
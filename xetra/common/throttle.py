@@ -0,0 +1,207 @@
+"""
+Methods for adaptive concurrency control of S3 requests
+"""
+import logging
+import random
+import threading
+import time
+from typing import NamedTuple
+
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError, \
+    IncompleteReadError
+from urllib3.exceptions import ProtocolError
+
+# Error codes and HTTP status codes S3 uses for throttling
+THROTTLE_ERROR_CODES = {'SlowDown', 'Throttling', 'ThrottlingException', 'RequestLimitExceeded',
+                        'TooManyRequestsException', 'ServiceUnavailable', '503'}
+THROTTLE_STATUS_CODES = {429, 503}
+# Server side errors that are worth a retry
+RETRY_ERROR_CODES = {'InternalError', 'RequestTimeout', '500', '502', '504'}
+RETRY_STATUS_CODES = {500, 502, 504}
+# Transport errors botocore retries itself, its retries are turned off with the controller.
+# HTTPClientError covers closed connections and read timeouts, IncompleteReadError and
+# ProtocolError are raised while reading a response body.
+RETRY_EXCEPTIONS = (BotoConnectionError, HTTPClientError, IncompleteReadError, ProtocolError)
+
+
+class ThrottleConfig(NamedTuple):
+    """
+    Configuration of the adaptive concurrency controller
+
+    initial_limit, min_limit, max_limit: bounds of the concurrent requests
+    increase_step: additive increase after a window of successful requests
+    decrease_factor: multiplicative decrease on throttling, errors or latency spikes
+    latency_factor: a request slower than latency_factor x average latency is a latency spike
+    max_retries: retries per request on throttling and server errors
+    base_backoff_seconds, max_backoff_seconds: bounds of the exponential backoff with full jitter
+    """
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    increase_step: int
+    decrease_factor: float
+    latency_factor: float
+    max_retries: int
+    base_backoff_seconds: float
+    max_backoff_seconds: float
+
+
+def is_throttle_error(error: Exception):
+    """
+    :return: True if the error is a throttling response of S3
+    """
+    if not isinstance(error, ClientError):
+        return False
+    code = error.response.get('Error', {}).get('Code')
+    status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return code in THROTTLE_ERROR_CODES or status in THROTTLE_STATUS_CODES
+
+
+def is_retryable_error(error: Exception):
+    """
+    :return: True if the error is a transient server or connection error
+    """
+    if isinstance(error, RETRY_EXCEPTIONS):
+        return True
+    if not isinstance(error, ClientError):
+        return False
+    code = error.response.get('Error', {}).get('Code')
+    status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return code in RETRY_ERROR_CODES or status in RETRY_STATUS_CODES
+
+
+class AdaptiveConcurrencyController:
+    """
+    class for limiting concurrent requests with additive increase / multiplicative decrease (AIMD).
+
+    A window is `limit` completed requests, successful or failed. The limit grows by increase_step
+    after a window that reached the limit of in-flight requests without throttling, server errors
+    or latency spikes, so it only grows when the callers actually need it. It is multiplied by
+    decrease_factor on throttling, errors and latency spikes, at most once per window, so it keeps
+    shrinking under sustained throttling. Latency spikes are detected against the average latency
+    of the same operation, e.g. a full GET is not compared with range GETs.
+    Throttled and failed requests are retried with exponential backoff.
+    """
+
+    def __init__(self, throttle_args: ThrottleConfig):
+        """
+        :param throttle_args: ThrottleConfig
+        """
+        self._logger = logging.getLogger(__name__)
+        self.throttle_args = throttle_args
+        self._condition = threading.Condition()
+        self._limit = float(throttle_args.initial_limit)
+        self._in_flight = 0
+        self._window_completed = 0
+        self._window_decreased = False
+        self._window_max_in_flight = 0
+        self._avg_latency = {}
+        self._requests = 0
+        self._retries = 0
+        self._throttles = 0
+        self._errors = 0
+
+    @property
+    def limit(self):
+        """
+        current limit of concurrent requests
+        """
+        return int(self._limit)
+
+    def metrics(self):
+        """
+        :return: dict with the current limit, in-flight requests, request, retry and error counts
+            and the average latency per operation
+        """
+        with self._condition:
+            return {'limit': self.limit, 'in_flight': self._in_flight, 'requests': self._requests,
+                    'retries': self._retries, 'throttles': self._throttles, 'errors': self._errors,
+                    'avg_latency_seconds': dict(self._avg_latency)}
+
+    def call(self, function, *args, operation: str = 'request', **kwargs):
+        """
+        Calling function within the concurrency limit, retrying throttled and failed calls
+
+        :param function: the request
+        :param operation: type of the request, e.g. 'list' or 'get', latencies are averaged per type
+        :return: the result of function
+        """
+        for attempt in range(self.throttle_args.max_retries + 1):
+            self._acquire()
+            start = time.monotonic()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as error:
+                throttled = is_throttle_error(error)
+                if not throttled and not is_retryable_error(error):
+                    self._release()
+                    raise
+                self._on_failure(throttled)
+                if attempt == self.throttle_args.max_retries:
+                    raise
+                with self._condition:
+                    self._retries += 1
+                self._logger.info('Request %s (%s), retry %s', 'throttled' if throttled else 'failed',
+                                  error, attempt + 1)
+                time.sleep(random.uniform(0, min(self.throttle_args.max_backoff_seconds,
+                                                 self.throttle_args.base_backoff_seconds * 2 ** attempt)))
+                continue
+            self._on_success(time.monotonic() - start, operation)
+            return result
+
+    def _acquire(self):
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+            self._window_max_in_flight = max(self._window_max_in_flight, self._in_flight)
+            self._requests += 1
+
+    def _release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _decrease(self):
+        """
+        Multiplicative decrease, once per window
+        """
+        if not self._window_decreased:
+            self._limit = max(self.throttle_args.min_limit, self._limit * self.throttle_args.decrease_factor)
+            self._window_decreased = True
+            self._window_completed = 0
+            self._logger.info('Decreasing S3 request limit to %s', self.limit)
+
+    def _complete_window(self):
+        """
+        Counting a completed request, a full window ends the decrease of the last window
+        """
+        self._window_completed += 1
+        if self._window_completed >= self.limit:
+            if not self._window_decreased and self._window_max_in_flight >= self.limit:
+                # A full window at the limit without throttling: additive increase
+                self._limit = min(self.throttle_args.max_limit, self._limit + self.throttle_args.increase_step)
+            self._window_completed = 0
+            self._window_decreased = False
+            self._window_max_in_flight = self._in_flight
+
+    def _on_failure(self, throttled: bool):
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._throttles += 1
+            else:
+                self._errors += 1
+            self._decrease()
+            self._complete_window()
+            self._condition.notify_all()
+
+    def _on_success(self, latency: float, operation: str):
+        with self._condition:
+            self._in_flight -= 1
+            avg_latency = self._avg_latency.get(operation)
+            if avg_latency is not None and latency > self.throttle_args.latency_factor * avg_latency:
+                self._decrease()
+            self._complete_window()
+            self._avg_latency[operation] = latency if avg_latency is None else 0.9 * avg_latency + 0.1 * latency
+            self._condition.notify_all()
@@ -0,0 +1,135 @@
+"""
+Methods for compacting small report output files
+"""
+from typing import NamedTuple
+import logging
+from datetime import datetime, timezone
+import pandas as pd
+
+from xetra.common.constants import S3FileTypes
+from xetra.common.manifest import ReportManifest
+from xetra.common.storage import StorageConnector
+
+
+class CompactionConfig(NamedTuple):
+    """
+    Configuration of the report compaction
+
+    manifest_key: key of the manifest of the report files
+    compacted_key: key prefix of the compacted files, outside of the report key prefix
+    target_file_rows: maximum rows per compacted file
+    row_group_rows: rows per parquet row group, the min/max statistics are kept per row group
+    unlisted_grace_seconds: report files missing in the manifest are only compacted when they are
+        older than this, a running load may not have added its file to the manifest yet
+    """
+    manifest_key: str
+    compacted_key: str
+    target_file_rows: int
+    row_group_rows: int
+    unlisted_grace_seconds: int
+
+
+class ReportCompactor:
+    """
+    class for merging the small per-run report files into larger files sorted by date and ISIN
+    """
+
+    def __init__(self, s3_bucket: StorageConnector, compaction_args: CompactionConfig,
+                 report_key: str, key_date_format: str, col_date: str, col_isin: str):
+        """
+        :param s3_bucket: StorageConnector for the bucket with the report files
+        :param compaction_args: CompactionConfig
+        :param report_key: key prefix of the report files written by the ETL runs
+        :param key_date_format: date format used in the keys of the report files
+        :param col_date: date column of the report files
+        :param col_isin: ISIN column of the report files
+        """
+        self._logger = logging.getLogger(__name__)
+        self.s3_bucket = s3_bucket
+        self.compaction_args = compaction_args
+        self.report_key = report_key
+        self.key_date_format = key_date_format
+        self.col_date = col_date
+        self.col_isin = col_isin
+        self.manifest = ReportManifest(s3_bucket, compaction_args.manifest_key, col_date, col_isin)
+
+    def _read(self, key: str):
+        """
+        Reading a report file in the format given by its extension
+        """
+        if key.endswith(f'.{S3FileTypes.CSV.value}'):
+            return self.s3_bucket.read_csv_to_data_frame(key)
+        return self.s3_bucket.read_parquet_to_data_frame(key)
+
+    def compact(self):
+        """
+        Merges all small report files, and the compacted files overlapping their dates,
+        into compacted files and publishes them in the manifest.
+        Rows of the same ISIN and day are taken from the most recent run.
+
+        :return: list of keys of the new compacted files
+        """
+        self._logger.info('Compacting report files started...')
+        manifest = self.manifest.read()
+        known_keys = {entry['key'] for entry in manifest['files']}
+        # Report files written before the manifest existed are picked up by one listing.
+        # Recent ones are left alone, their load may still add them to the manifest
+        # and would point to a deleted key otherwise
+        written_before = datetime.now(timezone.utc).timestamp() - self.compaction_args.unlisted_grace_seconds
+        unlisted = [obj for obj in self.s3_bucket.list_objects_in_prefix(self.report_key)
+                    if obj.key not in known_keys]
+        recent_keys = [obj.key for obj in unlisted if obj.last_modified.timestamp() > written_before]
+        if recent_keys:
+            self._logger.info('Skipping %s report files not yet in the manifest: %s', len(recent_keys), recent_keys)
+        small_keys = [entry['key'] for entry in manifest['files'] if not entry['compacted']] \
+            + [obj.key for obj in unlisted if obj.key not in recent_keys]
+        if not small_keys:
+            self._logger.info('No report files to compact.')
+            return []
+
+        # Keys continue with the run timestamp after the report prefix, also the keys of merged
+        # worker runs, so sorting them orders the runs
+        small_frames = [self._read(key) for key in sorted(small_keys)]
+        small_frames = [data_frame for data_frame in small_frames if not data_frame.empty]
+        if small_frames:
+            min_date = min(data_frame[self.col_date].min() for data_frame in small_frames)
+            max_date = max(data_frame[self.col_date].max() for data_frame in small_frames)
+            compacted_keys = [entry['key'] for entry in manifest['files'] if entry['compacted']
+                              and entry['max_date'] >= min_date and entry['min_date'] <= max_date]
+        else:
+            compacted_keys = []
+        frames = [self._read(key) for key in compacted_keys] + small_frames
+
+        entries = []
+        if frames:
+            data_frame = pd.concat(frames, ignore_index=True)\
+                .drop_duplicates(subset=[self.col_isin, self.col_date], keep='last')\
+                .sort_values(by=[self.col_date, self.col_isin], ignore_index=True)
+            entries = self._write_compacted(data_frame)
+
+        old_keys = compacted_keys + small_keys
+        new_keys = [entry['key'] for entry in entries]
+        self.manifest.replace_files(old_keys, entries)
+        # Deleting only after the new manifest is published, a rewrite can reuse the key of an old file
+        self.s3_bucket.delete_objects([key for key in old_keys if key not in new_keys])
+        self._logger.info('Compacted %s files into %s files.', len(old_keys), len(entries))
+        return new_keys
+
+    def _write_compacted(self, data_frame: pd.DataFrame):
+        """
+        Writing the sorted rows into files of at most target_file_rows rows
+
+        :param data_frame: Pandas DataFrame sorted by date and ISIN
+        :return: list of manifest entries of the written files
+        """
+        timestamp = datetime.today().strftime(self.key_date_format)
+        entries = []
+        for part, start in enumerate(range(0, len(data_frame), self.compaction_args.target_file_rows)):
+            chunk = data_frame.iloc[start:start + self.compaction_args.target_file_rows]\
+                .reset_index(drop=True)
+            key = (f'{self.compaction_args.compacted_key}{chunk[self.col_date].iloc[0]}_'
+                   f'{chunk[self.col_date].iloc[-1]}_{timestamp}_{part:03d}.{S3FileTypes.PARQUET.value}')
+            self.s3_bucket.write_df_to_s3_bucket(chunk, key, S3FileTypes.PARQUET.value,
+                                                 row_group_size=self.compaction_args.row_group_rows)
+            entries.append(self.manifest.file_entry(key, chunk, compacted=True))
+        return entries
@@ -0,0 +1,147 @@
+"""
+Methods for running report 1 with several workers on date shards
+"""
+from typing import NamedTuple
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime
+
+from xetra.common.constants import S3FileTypes
+from xetra.common.lease import LeaseManager
+from xetra.transformers.xetra_transformers import XetraETL
+
+
+class WorkerConfig(NamedTuple):
+    """
+    Configuration of the worker mode
+
+    lease_prefix: key prefix of the lease objects on the target bucket
+    partial_prefix: key prefix of the partial outputs of the shards
+    shard_days: number of consecutive days per shard
+    lease_seconds: time after which the shard of a failed worker can be taken over
+    settle_seconds: time between writing and verifying a lease claim
+    """
+    lease_prefix: str
+    partial_prefix: str
+    shard_days: int
+    lease_seconds: int
+    settle_seconds: float
+
+
+class XetraShardWorker:
+    """
+    class for processing report 1 in date shards claimed through lease objects.
+
+    Every worker extracts and aggregates the shards it claims and writes the per ISIN and day
+    aggregates as partial output. The cross-day transformations need all days, so they run once
+    in the merge step, which also loads the report and updates the meta file.
+    """
+
+    def __init__(self, xetra_etl: XetraETL, worker_args: WorkerConfig, worker_id: str = None):
+        """
+        :param xetra_etl: XetraETL of this worker
+        :param worker_args: WorkerConfig
+        :param worker_id: unique id of this worker, generated if None
+        """
+        self._logger = logging.getLogger(__name__)
+        self.xetra_etl = xetra_etl
+        self.worker_args = worker_args
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self.leases = LeaseManager(xetra_etl.s3_bucket_trg, self.worker_id,
+                                   worker_args.lease_seconds, worker_args.settle_seconds)
+        # All workers derive the same run id from the meta file
+        date_list = xetra_etl.extract_date_list
+        self.run_id = f'{date_list[0]}_{date_list[-1]}' if date_list else None
+
+    def shards(self):
+        """
+        Splitting extract_date_list into shards of consecutive days
+
+        :return: list of (shard_id, date_list)
+        """
+        date_list = self.xetra_etl.extract_date_list
+        shard_days = self.worker_args.shard_days
+        return [(f'{number:05d}', date_list[start:start + shard_days])
+                for number, start in enumerate(range(0, len(date_list), shard_days))]
+
+    def _lease_key(self, shard_id: str, run_id: str = None):
+        return f'{self.worker_args.lease_prefix}{run_id or self.run_id}/{shard_id}.json'
+
+    def _partial_key(self, shard_id: str):
+        return f'{self.worker_args.partial_prefix}{self.run_id}/{shard_id}.{S3FileTypes.PARQUET.value}'
+
+    def run(self):
+        """
+        Processing every shard that can be claimed
+
+        :return: list of the processed shard ids
+        """
+        processed = []
+        for shard_id, date_list in self.shards():
+            lease_key = self._lease_key(shard_id)
+            if not self.leases.claim(lease_key):
+                continue
+            self._logger.info('Worker %s processing shard %s: %s - %s',
+                              self.worker_id, shard_id, date_list[0], date_list[-1])
+            data_frame = self.xetra_etl.extract_aggregated(date_list)
+            # Shards without source data have no partial output
+            self.xetra_etl.s3_bucket_trg.write_df_to_s3_bucket(self.xetra_etl.decode_keys(data_frame),
+                                                               self._partial_key(shard_id),
+                                                               S3FileTypes.PARQUET.value)
+            self.leases.complete(lease_key)
+            processed.append(shard_id)
+        return processed
+
+    def merge(self):
+        """
+        Merging the partial outputs once all shards are done:
+        cross-day transformations, load and a single meta file update.
+        Only one worker performs the merge. The merge is idempotent, as a claim race or the takeover
+        of an expired merge lease can run it twice: the report key is derived from run_id and the time
+        of the first merge claim, the meta file is only updated if the run is not recorded yet,
+        and the partial outputs are kept until the merge of a later run deletes them.
+
+        :return: True if this worker merged the run
+        """
+        if not self.run_id:
+            self._logger.info('No dates to process.')
+            return False
+        pending = [shard_id for shard_id, _ in self.shards() if not self.leases.is_done(self._lease_key(shard_id))]
+        if pending:
+            self._logger.info('Merge postponed, %s shards pending. Shards of failed workers are taken over '
+                              'by the next worker run after lease_seconds.', len(pending))
+            return False
+        if not self.leases.claim(self._lease_key('merge')):
+            return False
+        # The first claim of the merge dates the report among the other runs, also after a takeover
+        run_time = datetime.fromtimestamp(self.leases.read(self._lease_key('merge'))['created'])
+
+        partial_keys = self.xetra_etl.s3_bucket_trg.list_file_in_prefix(
+            f'{self.worker_args.partial_prefix}{self.run_id}/')
+        data_frame = self.xetra_etl.concat_aggregates(
+            [self.xetra_etl.encode_keys(self.xetra_etl.s3_bucket_trg.read_parquet_to_data_frame(key))
+             for key in partial_keys])
+        data_frame = self.xetra_etl.finalize_report1(data_frame)
+        self.xetra_etl.load(data_frame, run_id=self.run_id, run_time=run_time)
+        self.leases.complete(self._lease_key('merge'))
+        self.delete_merged_partials()
+        self._logger.info('Worker %s merged run %s.', self.worker_id, self.run_id)
+        return True
+
+    def delete_merged_partials(self):
+        """
+        Deleting the partial outputs of earlier runs whose merge is done
+
+        :return: list of the deleted keys
+        """
+        prefix = self.worker_args.partial_prefix
+        keys = [key for key in self.xetra_etl.s3_bucket_trg.list_file_in_prefix(prefix)
+                if not key.startswith(f'{prefix}{self.run_id}/')]
+        run_ids = {key[len(prefix):].split('/')[0] for key in keys}
+        merged = {run_id for run_id in run_ids
+                  if self.leases.is_done(self._lease_key('merge', run_id))}
+        keys = [key for key in keys if key[len(prefix):].split('/')[0] in merged]
+        self.xetra_etl.s3_bucket_trg.delete_objects(keys)
+        return keys
@@ -0,0 +1,182 @@
+"""
+Methods for the intraday mode, folding new hourly source files into running aggregates
+"""
+from typing import NamedTuple
+import logging
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from xetra.common.constants import MetaProcessFormat, S3FileTypes
+from xetra.common.storage import StorageConnector
+from xetra.transformers.xetra_transformers import XetraSourceConfig, XetraTargetConfig
+
+# Time of the first and last source row folded into the running aggregates
+COL_FIRST_TIME = 'first_time'
+COL_LAST_TIME = 'last_time'
+
+
+class IntradayConfig(NamedTuple):
+    """
+    Configuration of the intraday mode
+
+    snapshot_key: key prefix of the intraday snapshots, one snapshot per day overwritten on every update
+    poll_seconds: time between two polls of the source prefix
+    """
+    snapshot_key: str
+    poll_seconds: float
+
+
+class XetraIntradayService:
+    """
+    class for publishing intraday opening, closing, minimum, maximum price and traded volume per ISIN.
+
+    Every poll lists the source prefix of the current day and folds only the rows of new hourly files
+    into running aggregates with one row per ISIN, so the state does not grow with the number of files.
+    The aggregates are reset at the day change. A republished file (changed ETag) cannot be
+    subtracted from the aggregates, so the day is folded again from all of its files.
+    """
+
+    def __init__(self,
+                 s3_bucket_source: StorageConnector,
+                 s3_bucket_target: StorageConnector,
+                 src_args: XetraSourceConfig,
+                 trg_args: XetraTargetConfig,
+                 intraday_args: IntradayConfig):
+        """
+        :param s3_bucket_source: connector of the source files
+        :param s3_bucket_target: connector the snapshots are written to
+        :param src_args: XetraSourceConfig
+        :param trg_args: XetraTargetConfig
+        :param intraday_args: IntradayConfig
+        """
+        self._logger = logging.getLogger(__name__)
+        self.s3_bucket_source = s3_bucket_source
+        self.s3_bucket_trg = s3_bucket_target
+        self.src_args = src_args
+        self.trg_args = trg_args
+        self.intraday_args = intraday_args
+        self.date = None
+        self.seen_objects = {}
+        self.aggregates = self._empty_aggregates()
+
+    def _empty_aggregates(self):
+        return pd.DataFrame(columns=[COL_FIRST_TIME, self.trg_args.trg_col_op_price,
+                                     COL_LAST_TIME, self.trg_args.trg_col_clos_price,
+                                     self.trg_args.trg_col_min_price, self.trg_args.trg_col_max_price,
+                                     self.trg_args.trg_col_dail_trad_vol],
+                            index=pd.Index([], name=self.src_args.src_col_isin))
+
+    def _reset(self, date: str):
+        self.date = date
+        self.seen_objects = {}
+        self.aggregates = self._empty_aggregates()
+
+    def snapshot_key(self, date: str):
+        """
+        :return: key of the intraday snapshot of date
+        """
+        return f'{self.intraday_args.snapshot_key}{date}.{S3FileTypes.PARQUET.value}'
+
+    def aggregate_file(self, data_frame: pd.DataFrame):
+        """
+        Aggregates the rows of one or more source files per ISIN
+
+        :param data_frame: Pandas DataFrame with source rows of one day
+        :return:
+            data_frame: Pandas DataFrame in the format of the running aggregates
+        """
+        data_frame = data_frame.loc[:, self.src_args.src_columns].dropna()
+        grouped = data_frame.sort_values(by=[self.src_args.src_col_time], kind='stable')\
+            .groupby(self.src_args.src_col_isin)
+        return pd.DataFrame({
+            COL_FIRST_TIME: grouped[self.src_args.src_col_time].first(),
+            self.trg_args.trg_col_op_price: grouped[self.src_args.src_col_start_price].first(),
+            COL_LAST_TIME: grouped[self.src_args.src_col_time].last(),
+            self.trg_args.trg_col_clos_price: grouped[self.src_args.src_col_start_price].last(),
+            self.trg_args.trg_col_min_price: grouped[self.src_args.src_col_min_price].min(),
+            self.trg_args.trg_col_max_price: grouped[self.src_args.src_col_max_price].max(),
+            self.trg_args.trg_col_dail_trad_vol: grouped[self.src_args.src_col_traded_vol].sum()
+        })
+
+    def fold(self, aggregates: pd.DataFrame):
+        """
+        Folds per ISIN aggregates of new files into the running aggregates
+
+        :param aggregates: Pandas DataFrame as returned by aggregate_file
+        """
+        if self.aggregates.empty:
+            self.aggregates = aggregates
+            return
+        combined = pd.concat([self.aggregates, aggregates])
+        # Stable sorts keep the running aggregate first on equal times
+        opening = combined.sort_values(by=[COL_FIRST_TIME], kind='stable')\
+            .groupby(level=0)[[COL_FIRST_TIME, self.trg_args.trg_col_op_price]].first()
+        closing = combined.sort_values(by=[COL_LAST_TIME], kind='stable')\
+            .groupby(level=0)[[COL_LAST_TIME, self.trg_args.trg_col_clos_price]].last()
+        extremes = combined.groupby(level=0).agg({
+            self.trg_args.trg_col_min_price: 'min',
+            self.trg_args.trg_col_max_price: 'max',
+            self.trg_args.trg_col_dail_trad_vol: 'sum'})
+        self.aggregates = pd.concat([opening, closing, extremes], axis=1)
+
+    def snapshot(self):
+        """
+        :return: Pandas DataFrame with the intraday figures per ISIN of the current day
+        """
+        data_frame = self.aggregates.reset_index()\
+            .rename(columns={COL_LAST_TIME: self.src_args.src_col_time})\
+            .drop(columns=[COL_FIRST_TIME])
+        data_frame.insert(1, self.src_args.src_col_date, self.date)
+        return data_frame.round(decimals=2)
+
+    def run_once(self, date: str = None):
+        """
+        Folds the source files of date that are new since the last poll and publishes the snapshot
+
+        :param date: trading day, defaults to today
+        :return:
+            new_files: number of folded files
+        """
+        if date is None:
+            date = datetime.today().strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+        if date != self.date:
+            self._logger.info('Starting intraday aggregates of %s', date)
+            self._reset(date)
+        objects = self.s3_bucket_source.list_objects_in_prefix(date)
+        if any(self.seen_objects.get(obj.key, obj.etag) != obj.etag for obj in objects):
+            self._logger.info('Source files of %s were republished, folding the day again', date)
+            self._reset(date)
+        new_objects = [obj for obj in objects if obj.key not in self.seen_objects]
+        if not new_objects:
+            return 0
+        data_frame = pd.concat([self.s3_bucket_source.read_csv_to_data_frame(
+            obj.key, columns=self.src_args.src_columns) for obj in new_objects], ignore_index=True)
+        if not data_frame.empty:
+            self.fold(self.aggregate_file(data_frame))
+        self.seen_objects.update({obj.key: obj.etag for obj in new_objects})
+        self.s3_bucket_trg.write_df_to_s3_bucket(self.snapshot(), self.snapshot_key(date),
+                                                 S3FileTypes.PARQUET.value)
+        self._logger.info('Folded %s new files into the intraday snapshot of %s, %s ISINs.',
+                          len(new_objects), date, len(self.aggregates))
+        return len(new_objects)
+
+    def run_forever(self, stop_event: threading.Event = None):
+        """
+        Polls the source every poll_seconds until stop_event is set.
+        Failed polls are logged and retried with the next poll.
+
+        :param stop_event: threading.Event stopping the service, runs until interrupted if None
+        """
+        stop_event = stop_event or threading.Event()
+        self._logger.info('Xetra intraday service started.')
+        while not stop_event.is_set():
+            start = time.monotonic()
+            try:
+                self.run_once()
+            except Exception:
+                self._logger.exception('Intraday poll failed.')
+            stop_event.wait(max(0.0, self.intraday_args.poll_seconds - (time.monotonic() - start)))
+        self._logger.info('Xetra intraday service stopped.')
@@ -0,0 +1,141 @@
+"""
+Methods for incrementally maintained rolling-window metrics of report 1
+"""
+from typing import NamedTuple
+import logging
+import pandas as pd
+
+from xetra.common.constants import MetaProcessFormat
+from xetra.common.storage import StorageConnector
+
+
+class RollingWindowConfig(NamedTuple):
+    """
+    Configuration of the rolling-window metrics
+
+    windows: window lengths in trading days of the closing price moving averages
+    volatility_window: window length of the daily return volatility
+    volume_window: window length of the rolling traded volume
+    state_key: key of the per ISIN window state file, stored next to the meta file
+    trg_col_moving_avg, trg_col_volatility, trg_col_volume: target column names,
+        '{}' is replaced by the window length
+    """
+    windows: list
+    volatility_window: int
+    volume_window: int
+    state_key: str
+    trg_col_moving_avg: str
+    trg_col_volatility: str
+    trg_col_volume: str
+
+
+class RollingWindow:
+    """
+    class for computing rolling-window metrics from new days and a persisted window state.
+
+    The state keeps the last rows per ISIN that the longest window needs, so a run costs
+    O(new days x ISINs) instead of O(history).
+    """
+
+    def __init__(self, rolling_args: RollingWindowConfig,
+                 col_isin: str, col_date: str, col_price: str, col_volume: str):
+        """
+        :param rolling_args: RollingWindowConfig
+        :param col_isin: ISIN column of the aggregated report frame
+        :param col_date: date column of the aggregated report frame
+        :param col_price: closing price column of the aggregated report frame
+        :param col_volume: daily traded volume column of the aggregated report frame
+        """
+        self._logger = logging.getLogger(__name__)
+        self.rolling_args = rolling_args
+        self.col_isin = col_isin
+        self.col_date = col_date
+        self.col_price = col_price
+        self.col_volume = col_volume
+        # Volatility needs one extra price for the first return of the window
+        self.state_size = max(list(rolling_args.windows)
+                              + [rolling_args.volatility_window + 1, rolling_args.volume_window])
+
+    @property
+    def state_columns(self):
+        """
+        columns of the window state
+        """
+        return [self.col_isin, self.col_date, self.col_price, self.col_volume]
+
+    def read_state(self, s3_bucket_meta: StorageConnector):
+        """
+        Reading the window state, an empty state is returned if there is none yet
+
+        :param s3_bucket_meta: StorageConnector for the bucket with the meta file
+        :return: Pandas DataFrame with the window state
+        """
+        try:
+            return s3_bucket_meta.read_csv_to_data_frame(self.rolling_args.state_key)
+        except s3_bucket_meta.no_such_key:
+            self._logger.info('No window state found, starting with an empty one.')
+            return pd.DataFrame(columns=self.state_columns)
+
+    def write_state(self, state: pd.DataFrame, s3_bucket_meta: StorageConnector):
+        """
+        Writing the window state next to the meta file
+
+        :param state: Pandas DataFrame with the window state
+        :param s3_bucket_meta: StorageConnector for the bucket with the meta file
+        """
+        return s3_bucket_meta.write_df_to_s3_bucket(state, self.rolling_args.state_key,
+                                                    MetaProcessFormat.META_FILE_FORMAT.value)
+
+    def apply(self, data_frame: pd.DataFrame, state: pd.DataFrame):
+        """
+        Adds the rolling-window metrics to the aggregated report frame
+
+        :param data_frame: Pandas DataFrame with one row per ISIN and day
+        :param state: window state as returned by read_state
+        :return:
+            data_frame: data_frame with the rolling-window columns
+            state: updated window state
+        """
+        # New rows replace state rows of the same ISIN and day (reprocessed days)
+        history = pd.concat([state.loc[:, self.state_columns],
+                             data_frame.loc[:, self.state_columns]], ignore_index=True)\
+            .drop_duplicates(subset=[self.col_isin, self.col_date], keep='last')\
+            .sort_values(by=[self.col_isin, self.col_date], ignore_index=True)
+        history[self.col_price] = history[self.col_price].astype(float)
+        history[self.col_volume] = history[self.col_volume].astype(float)
+        grouped = history.groupby(self.col_isin)
+
+        metric_columns = []
+        for window in self.rolling_args.windows:
+            column = self.rolling_args.trg_col_moving_avg.format(window)
+            history[column] = self._rolling(grouped[self.col_price], window, 'mean')
+            metric_columns.append(column)
+
+        # Volatility as standard deviation of the daily returns in %
+        column = self.rolling_args.trg_col_volatility.format(self.rolling_args.volatility_window)
+        history['_return'] = grouped[self.col_price].pct_change() * 100
+        history[column] = self._rolling(history.groupby(self.col_isin)['_return'],
+                                        self.rolling_args.volatility_window, 'std')
+        metric_columns.append(column)
+
+        column = self.rolling_args.trg_col_volume.format(self.rolling_args.volume_window)
+        history[column] = self._rolling(grouped[self.col_volume], self.rolling_args.volume_window, 'sum')
+        metric_columns.append(column)
+
+        data_frame = data_frame.merge(history.loc[:, [self.col_isin, self.col_date] + metric_columns],
+                                      on=[self.col_isin, self.col_date], how='left')
+        state = history.groupby(self.col_isin).tail(self.state_size).loc[:, self.state_columns]\
+            .reset_index(drop=True)
+        return data_frame, state
+
+    @staticmethod
+    def _rolling(grouped_column, window: int, how: str):
+        """
+        Rolling aggregation per ISIN aligned with the index of the history frame
+
+        :param grouped_column: SeriesGroupBy of the history frame
+        :param window: window length, values are only computed for complete windows
+        :param how: aggregation, e.g. 'mean', 'std' or 'sum'
+        """
+        rolling = grouped_column.rolling(window, min_periods=window)
+        return getattr(rolling, how)().reset_index(level=0, drop=True)
@@ -1,9 +1,26 @@
 from typing import NamedTuple
 import logging
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from xetra.common.constants import ExecutionStrategy
+from xetra.common.date_planning import (ONE_DAY, DatePlan, batch_dates, extend_plan, format_dates, missing_ranges,
+                                        parse_dates, range_ids)
+from xetra.common.manifest import ReportManifest
+from xetra.common.materialization import DayAggregateStore, MaterializationConfig
 from xetra.common.meta_process import MetaProcess
-from xetra.common.s3 import S3BucketConnector
+from xetra.common.planner import ExecutionPlanner, PlannerConfig
+from xetra.common.storage import StorageConnector
+from xetra.common.symbol_table import SymbolTable, SymbolTableConfig, decode_dates, encode_dates
+from xetra.transformers.compaction import CompactionConfig
+from xetra.transformers.rolling_window import RollingWindow, RollingWindowConfig
+
+# Integer key columns used for grouping, sorting and shifting
+COL_ISIN_CODE = '_isin_code'
+COL_DATE_CODE = '_date_code'
+# Days without source files that are skipped to the previous trading day of a missing range
+MAX_NON_TRADING_DAYS = 7
 
 
 class XetraSourceConfig(NamedTuple):
@@ -35,12 +52,25 @@ class XetraTargetConfig(NamedTuple):
 
 class XetraETL:
 
+    # Methods profiled as stages with run.py --profile, transform_report1 as its two steps
+    # and both of them as their single steps, nested stages are profiled separately
+    PROFILE_STAGES = ['plan_execution', 'extract', 'extract_streaming', 'extract_materialized',
+                      'aggregate_report1', 'select_source_columns', 'drop_missing_values', 'encode_source_keys',
+                      'aggregate_days', 'finalize_report1', 'sort_by_keys', 'change_prev_closing',
+                      'decode_report_keys', 'apply_rolling_window', 'round_report', 'filter_process_days',
+                      'load']
+
     def __init__(self,
-                 s3_bucket_source: S3BucketConnector,
-                 s3_bucket_target: S3BucketConnector,
+                 s3_bucket_source: StorageConnector,
+                 s3_bucket_target: StorageConnector,
                  meta_key: str,
                  src_args: XetraSourceConfig,
-                 trg_args: XetraTargetConfig):
+                 trg_args: XetraTargetConfig,
+                 planner_args: PlannerConfig = None,
+                 rolling_args: RollingWindowConfig = None,
+                 materialization_args: MaterializationConfig = None,
+                 compaction_args: CompactionConfig = None,
+                 symbol_args: SymbolTableConfig = None):
 
         self._logger = logging.getLogger(__name__)
         self.s3_bucket_source = s3_bucket_source
@@ -48,27 +78,268 @@ class XetraETL:
         self.meta_key = meta_key
         self.src_args = src_args
         self.trg_args = trg_args
-        self.extract_date, self.extract_date_list = MetaProcess.return_date_list(self.src_args.src_first_extract_date,
-                                                                                 self.meta_key, self.s3_bucket_trg)
-        self.meta_update_list = [date for date in self.extract_date_list if date >= self.extract_date]
+        # Only the missing dates are processed, each missing range with its previous day extracted
+        self.set_date_plan(MetaProcess.return_date_plan(self.src_args.src_first_extract_date,
+                                                        self.meta_key, self.s3_bucket_trg))
+        self.planner = ExecutionPlanner(self.s3_bucket_source, planner_args) if planner_args else None
+        self.plan = None
+        self.rolling_window = RollingWindow(rolling_args, self.src_args.src_col_isin,
+                                            self.src_args.src_col_date, self.trg_args.trg_col_clos_price,
+                                            self.trg_args.trg_col_dail_trad_vol) if rolling_args else None
+        self.window_state = None
+        self.aggregate_store = DayAggregateStore(self.s3_bucket_trg, materialization_args) \
+            if materialization_args else None
+        self.manifest = ReportManifest(self.s3_bucket_trg, compaction_args.manifest_key,
+                                       self.src_args.src_col_date, self.src_args.src_col_isin) \
+            if compaction_args else None
+        if self.aggregate_store:
+            # Processed days with republished source files are processed again
+            self.reprocess_republished_days()
+        self.extract_previous_trading_days()
+        self.symbol_table = SymbolTable(self.s3_bucket_trg, symbol_args, self.src_args.src_col_isin).read()
+
+    def set_date_plan(self, date_plan: DatePlan):
+        """
+        Setting the dates of this run
+
+        :param date_plan: DatePlan
+        """
+        self.date_plan = date_plan
+        self.extract_date = date_plan.first_date
+        self.extract_date_list = date_plan.extract_dates
+        self.meta_update_list = date_plan.process_dates
+
+    def reprocess_republished_days(self):
+        """
+        Compares the source fingerprints of the processed days within the look-back window
+        with their materialized aggregates and adds the days with republished source files to the run
+
+        :return:
+            changed_dates: list of the processed dates with republished source files
+        """
+        today = np.datetime64(datetime.today().date(), 'D')
+        days = np.arange(max(parse_dates([self.src_args.src_first_extract_date])[0],
+                             today - self.aggregate_store.materialization_args.lookback_days + 1),
+                         today + ONE_DAY, dtype='datetime64[D]')
+        days = days[~np.isin(days, parse_dates(self.meta_update_list))]
+        objects_by_date = {date: self.s3_bucket_source.list_objects_in_prefix(date)
+                           for date in format_dates(days)}
+        changed_dates = self.aggregate_store.changed_dates(objects_by_date, self.aggregate_store.list_artifacts())
+        if changed_dates:
+            self._logger.info('Source files of processed dates %s were republished, processing them again',
+                              changed_dates)
+            self.set_date_plan(extend_plan(self.date_plan, parse_dates(changed_dates)))
+        return changed_dates
+
+    def extract_previous_trading_days(self):
+        """
+        Extends the extraction of every missing range without source files on its previous day,
+        e.g. a weekend, back to the last trading day, at most MAX_NON_TRADING_DAYS days.
+        The previous day of the first extract date is not extended, like in a full run.
+
+        :return:
+            added_dates: list of the dates added to extract_date_list
+        """
+        extract_days = parse_dates(self.extract_date_list)
+        first_day = parse_dates([self.src_args.src_first_extract_date])[0] - ONE_DAY
+        starts, _ = missing_ranges(parse_dates(self.meta_update_list))
+        added_days = []
+        for day in starts - ONE_DAY:
+            for _ in range(MAX_NON_TRADING_DAYS):
+                # Stops at a trading day or at the extracted days of the previous range
+                if day <= first_day or (day - ONE_DAY) in extract_days \
+                        or self.s3_bucket_source.list_file_in_prefix(format_dates(np.array([day]))[0]):
+                    break
+                day = day - ONE_DAY
+                added_days.append(day)
+        if added_days:
+            self.extract_date_list = format_dates(np.union1d(extract_days, np.array(added_days)))
+            self.date_plan = self.date_plan._replace(extract_dates=self.extract_date_list)
+        return format_dates(np.sort(np.array(added_days, dtype='datetime64[D]')))
+
+    def plan_execution(self):
+        """
+        Creates the execution plan for extract_date_list, if a planner is configured
 
-    def extract(self):
+        :return:
+            plan: ExecutionPlan or None without planner
+        """
+        if self.planner:
+            self.plan = self.planner.plan(self.extract_date_list)
+        return self.plan
+
+    def extract(self, date_list: list = None):
         """
         Read the source data and concatenates them to one Pandas DataFrame.
+
+        :param date_list: dates to extract, defaults to extract_date_list
         :return:
             data_frame: Pandas DataFrame with the extracted data
         """
         self._logger.info('Extracting Xetra source files started...')
-        files = [key for date in self.extract_date_list
-                     for key in self.s3_bucket_source.list_file_in_prefix(date)]
+        if date_list is None:
+            date_list = self.extract_date_list
+        if self.plan:
+            # The planner already listed the source objects
+            files = [obj.key for date in date_list for obj in self.plan.objects_by_date[date]]
+            max_workers = self.plan.max_workers
+        else:
+            files = [key for date in date_list
+                         for key in self.s3_bucket_source.list_file_in_prefix(date)]
+            max_workers = 1
         if not files:
             data_frame = pd.DataFrame()
+        elif max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                data_frame = pd.concat(executor.map(self._read_source_file, files), ignore_index=True)
         else:
-            data_frame = pd.concat([self.s3_bucket_source.read_csv_to_data_frame(file) for file in files], ignore_index=True)
+            data_frame = pd.concat([self._read_source_file(file) for file in files], ignore_index=True)
         self._logger.info('Extraction Xetra source files finished.')
 
         return data_frame
 
+    def _read_source_file(self, key: str):
+        """
+        Reads one source file, restricted to the source columns when a plan exists
+
+        :param key: key of the source file
+        :return:
+            data_frame: Pandas DataFrame with the file content
+        """
+        if self.plan:
+            return self.s3_bucket_source.read_csv_to_data_frame(key, columns=self.src_args.src_columns)
+        return self.s3_bucket_source.read_csv_to_data_frame(key)
+
+    def extract_streaming(self):
+        """
+        Extracts and aggregates the source data in batches of days
+        as given by the execution plan, so only one batch of raw rows is held in memory
+
+        :return:
+            data_frame: Pandas DataFrame aggregated per ISIN and day
+        """
+        aggregates = []
+        for days in batch_dates(parse_dates(self.extract_date_list), self.plan.batch_days):
+            date_batch = format_dates(days)
+            self._logger.info('Processing batch %s - %s', date_batch[0], date_batch[-1])
+            aggregates.append(self.aggregate_report1(self.extract(date_batch)))
+        return self.concat_aggregates(aggregates)
+
+    def extract_materialized(self, date_list: list = None):
+        """
+        Extracts the per ISIN and day aggregates, reusing the materialized aggregate
+        of a day when the fingerprint of its source objects is unchanged.
+        Only days with new or republished source files are read and aggregated, in batches
+        of days and with the workers given by the execution plan.
+
+        :param date_list: dates to extract, defaults to extract_date_list
+        :return:
+            data_frame: Pandas DataFrame aggregated per ISIN and day
+        """
+        if date_list is None:
+            date_list = self.extract_date_list
+        if self.plan:
+            objects_by_date = self.plan.objects_by_date
+        else:
+            objects_by_date = {date: self.s3_bucket_source.list_objects_in_prefix(date)
+                               for date in date_list}
+        artifacts = self.aggregate_store.list_artifacts()
+        aggregates = []
+        changed = {}
+        for date in date_list:
+            key = self.aggregate_store.artifact_key(
+                date, self.aggregate_store.fingerprint(objects_by_date[date]))
+            if key in artifacts:
+                self._logger.info('Reusing materialized aggregate of %s', date)
+                aggregates.append(self.encode_keys(self.aggregate_store.read(key)))
+            else:
+                self._logger.info('Source of %s changed, aggregating it', date)
+                changed[date] = key
+        changed_dates = list(changed)
+        # Days are aggregated independently, so a batch doesn't have to be consecutive
+        batch_days = self.plan.batch_days if self.plan else max(len(changed_dates), 1)
+        for start in range(0, len(changed_dates), batch_days):
+            date_batch = changed_dates[start:start + batch_days]
+            data_frame = self.aggregate_report1(self.extract(date_batch))
+            aggregates.append(data_frame)
+            self.write_aggregates(data_frame, {date: changed[date] for date in date_batch})
+        return self.concat_aggregates(aggregates)
+
+    def write_aggregates(self, data_frame: pd.DataFrame, keys_by_date: dict):
+        """
+        Materializes the aggregate of a batch of days as one artifact per day
+
+        :param data_frame: Pandas DataFrame as returned by aggregate_report1
+        :param keys_by_date: dict date -> artifact key of the days in data_frame
+        """
+        if data_frame.empty:
+            return
+        date_codes = data_frame[COL_DATE_CODE].to_numpy()
+        for date, day_code in zip(keys_by_date, parse_dates(list(keys_by_date)).astype(np.int32)):
+            day_frame = data_frame[date_codes == day_code].reset_index(drop=True)
+            self.aggregate_store.write(self.decode_keys(day_frame), keys_by_date[date])
+
+    def extract_aggregated(self, date_list: list):
+        """
+        Extracts the per ISIN and day aggregates of the given dates,
+        from the materialized aggregates if they are configured
+
+        :param date_list: dates to extract
+        :return:
+            data_frame: Pandas DataFrame aggregated per ISIN and day
+        """
+        if self.aggregate_store:
+            return self.extract_materialized(date_list)
+        return self.aggregate_report1(self.extract(date_list))
+
+    def concat_aggregates(self, aggregates: list):
+        """
+        Concatenates aggregates of separate batches of days
+
+        :param aggregates: list of Pandas DataFrames as returned by aggregate_report1
+        :return:
+            data_frame: Pandas DataFrame aggregated per ISIN and day
+        """
+        aggregates = [data_frame for data_frame in aggregates if not data_frame.empty]
+        if not aggregates:
+            return pd.DataFrame()
+        # finalize_report1 sorts the rows
+        return pd.concat(aggregates, ignore_index=True)
+
+    def encode_keys(self, data_frame: pd.DataFrame):
+        """
+        Replaces the ISIN and date columns of persisted aggregates by integer keys
+
+        :param data_frame: Pandas DataFrame with one row per ISIN and day and string keys
+        :return:
+            data_frame: Pandas DataFrame as returned by aggregate_report1
+        """
+        if data_frame.empty:
+            return data_frame
+        isin_codes = self.symbol_table.encode(data_frame[self.src_args.src_col_isin])
+        date_codes = encode_dates(data_frame[self.src_args.src_col_date])
+        data_frame = data_frame.drop(columns=[self.src_args.src_col_isin, self.src_args.src_col_date])
+        data_frame.insert(0, COL_ISIN_CODE, isin_codes)
+        data_frame.insert(1, COL_DATE_CODE, date_codes)
+        return data_frame
+
+    def decode_keys(self, data_frame: pd.DataFrame):
+        """
+        Replaces the integer keys of aggregates by the ISIN and date columns for persisting them
+
+        :param data_frame: Pandas DataFrame as returned by aggregate_report1
+        :return:
+            data_frame: Pandas DataFrame with one row per ISIN and day and string keys
+        """
+        if data_frame.empty:
+            return data_frame
+        isins = self.symbol_table.decode(data_frame[COL_ISIN_CODE].to_numpy())
+        dates = decode_dates(data_frame[COL_DATE_CODE].to_numpy())
+        data_frame = data_frame.drop(columns=[COL_ISIN_CODE, COL_DATE_CODE])
+        data_frame.insert(0, self.src_args.src_col_isin, isins)
+        data_frame.insert(1, self.src_args.src_col_date, dates)
+        return data_frame
+
     def transform_report1(self, data_frame: pd.DataFrame):
         """
         Applies the necessary transformation to create report 1
@@ -78,95 +349,195 @@ class XetraETL:
         :return:
             data_frame: Transformed Pandas DataFrame as Output
         """
+        return self.finalize_report1(self.aggregate_report1(data_frame))
+
+    def aggregate_report1(self, data_frame: pd.DataFrame):
+        """
+        Aggregates the source rows per ISIN and day.
+        Days are independent of each other, so batches of days can be aggregated separately.
+
+        :param data_frame: Pandas Data frame with source rows
+
+        :return:
+            data_frame: Pandas DataFrame with one row per ISIN and day,
+                keyed by the integer ISIN and date codes
+        """
 
         if data_frame.empty:
             self._logger.info('The dataframe is empty. No transformations will be applied.')
             return data_frame
         self._logger.info('Applying transformations to Xetra source data for report 1 started...')
 
-        # Filtering necessary source columns
-        data_frame = data_frame.loc[:, self.src_args.src_columns]
-
-        # Removing rows with missing values
-        data_frame.dropna(inplace=True)
-
-        # Calculating opening price per ISIN and day
-        data_frame[self.trg_args.trg_col_op_price] = data_frame\
-            .sort_values(by=[self.src_args.src_col_time])\
-            .groupby([
-                    self.src_args.src_col_isin,
-                    self.src_args.src_col_date
-                    ])[self.src_args.src_col_start_price]\
-            .transform('first')
-
-        # Calculating closing price per ISIN and day
-        data_frame[self.trg_args.trg_col_clos_price] = data_frame\
-            .sort_values(by=[self.src_args.src_col_time])\
-            .groupby([
-                    self.src_args.src_col_isin,
-                    self.src_args.src_col_date
-                    ])[self.src_args.src_col_start_price]\
-            .transform('last')
-
-        # Renaming columns
-        data_frame.rename(columns={
-            self.src_args.src_col_min_price: self.trg_args.trg_col_min_price,
-            self.src_args.src_col_max_price: self.trg_args.trg_col_max_price,
-            self.src_args.src_col_traded_vol: self.trg_args.trg_col_dail_trad_vol
-            }, inplace=True)
-
-        # Aggregating per ISIN and day -> opening price, closing price,
-        # minimum price, maximum price, traded volume
-        data_frame = data_frame.groupby([
-            self.src_args.src_col_isin,
-            self.src_args.src_col_date], as_index=False)\
-            .agg({
-                    self.trg_args.trg_col_op_price: 'min',
-                    self.trg_args.trg_col_clos_price: 'min',
-                    self.trg_args.trg_col_min_price: 'min',
-                    self.trg_args.trg_col_max_price: 'max',
-                    self.trg_args.trg_col_dail_trad_vol: 'sum'})
-
-        # Change of current day's closing price compared to the
-        # previous trading day's closing price in %
+        data_frame = self.select_source_columns(data_frame)
+        data_frame = self.drop_missing_values(data_frame)
+        data_frame = self.encode_source_keys(data_frame)
+        return self.aggregate_days(data_frame)
+
+    def select_source_columns(self, data_frame: pd.DataFrame):
+        """
+        Filtering necessary source columns
+        """
+        return data_frame.loc[:, self.src_args.src_columns]
+
+    @staticmethod
+    def drop_missing_values(data_frame: pd.DataFrame):
+        """
+        Removing rows with missing values
+        """
+        return data_frame.dropna()
+
+    def encode_source_keys(self, data_frame: pd.DataFrame):
+        """
+        Integer keys instead of the ISIN and date strings
+        """
+        return data_frame.assign(**{
+            COL_ISIN_CODE: self.symbol_table.encode(data_frame[self.src_args.src_col_isin]),
+            COL_DATE_CODE: encode_dates(data_frame[self.src_args.src_col_date])})
+
+    def aggregate_days(self, data_frame: pd.DataFrame):
+        """
+        Aggregating per ISIN and day -> opening price, closing price,
+        minimum price, maximum price, traded volume
+        """
+        return data_frame\
+            .sort_values(by=[self.src_args.src_col_time], kind='stable')\
+            .groupby([COL_ISIN_CODE, COL_DATE_CODE], sort=False)\
+            .agg(**{
+                    self.trg_args.trg_col_op_price: (self.src_args.src_col_start_price, 'first'),
+                    self.trg_args.trg_col_clos_price: (self.src_args.src_col_start_price, 'last'),
+                    self.trg_args.trg_col_min_price: (self.src_args.src_col_min_price, 'min'),
+                    self.trg_args.trg_col_max_price: (self.src_args.src_col_max_price, 'max'),
+                    self.trg_args.trg_col_dail_trad_vol: (self.src_args.src_col_traded_vol, 'sum')})\
+            .reset_index()
+
+    def finalize_report1(self, data_frame: pd.DataFrame):
+        """
+        Applies the cross-day transformations of report 1 to the per ISIN and day aggregates
+
+        :param data_frame: Pandas DataFrame as returned by aggregate_report1
+
+        :return:
+            data_frame: Transformed Pandas DataFrame as Output
+        """
+
+        if data_frame.empty:
+            return data_frame
+
+        data_frame = self.sort_by_keys(data_frame)
+        data_frame = self.change_prev_closing(data_frame)
+        data_frame = self.decode_report_keys(data_frame)
+        if self.rolling_window:
+            data_frame = self.apply_rolling_window(data_frame)
+        data_frame = self.round_report(data_frame)
+        data_frame = self.filter_process_days(data_frame)
+        self._logger.info('Applying transformations to Xetra source data finished...')
+        return data_frame
+
+    def sort_by_keys(self, data_frame: pd.DataFrame):
+        """
+        Sorting by the integer keys, in ISIN and day order
+        """
+        isin_ranks = self.symbol_table.ranks(data_frame[COL_ISIN_CODE].to_numpy())
+        return data_frame.iloc[np.lexsort((data_frame[COL_DATE_CODE].to_numpy(), isin_ranks))]\
+            .reset_index(drop=True)
+
+    def change_prev_closing(self, data_frame: pd.DataFrame):
+        """
+        Change of current day's closing price compared to the
+        previous trading day's closing price in %,
+        within the range of consecutive extracted days of the missing range only
+        """
+        ranges = range_ids(data_frame[COL_DATE_CODE].to_numpy(dtype=np.int64).astype('datetime64[D]'),
+                           parse_dates(self.extract_date_list))
         data_frame[self.trg_args.trg_col_ch_prev_clos] = data_frame\
-            .sort_values(by=[self.src_args.src_col_date])\
-            .groupby([self.src_args.src_col_isin])[self.trg_args.trg_col_op_price]\
+            .groupby([data_frame[COL_ISIN_CODE], ranges], sort=False)[self.trg_args.trg_col_op_price]\
             .shift(1)
         data_frame[self.trg_args.trg_col_ch_prev_clos] = (
             data_frame[self.trg_args.trg_col_op_price] \
             - data_frame[self.trg_args.trg_col_ch_prev_clos]
             ) / data_frame[self.trg_args.trg_col_ch_prev_clos ] * 100
+        return data_frame
 
-        # Rounding to 2 decimals
-        data_frame = data_frame.round(decimals=2)
+    def decode_report_keys(self, data_frame: pd.DataFrame):
+        """
+        Mapping the keys back to strings once, the codes are kept for filtering the days
+        """
+        data_frame.insert(0, self.src_args.src_col_isin,
+                          self.symbol_table.decode(data_frame[COL_ISIN_CODE].to_numpy()))
+        data_frame.insert(1, self.src_args.src_col_date, decode_dates(data_frame[COL_DATE_CODE].to_numpy()))
+        return data_frame
 
-        # Removing the day before extract_date
-        data_frame = data_frame[data_frame.Date >= self.extract_date].reset_index(drop=True)
-        self._logger.info('Applying transformations to Xetra source data finished...')
+    def apply_rolling_window(self, data_frame: pd.DataFrame):
+        """
+        Rolling-window metrics, continued from the persisted window state
+        """
+        data_frame, self.window_state = self.rolling_window.apply(
+            data_frame, self.rolling_window.read_state(self.s3_bucket_trg))
         return data_frame
 
-    def load(self, data_frame: pd.DataFrame):
+    @staticmethod
+    def round_report(data_frame: pd.DataFrame):
+        """
+        Rounding to 2 decimals
+        """
+        return data_frame.round(decimals=2)
+
+    def filter_process_days(self, data_frame: pd.DataFrame):
+        """
+        Removing the extracted days before the missing ranges and the integer keys
+        """
+        process_days = encode_dates(pd.Series(self.meta_update_list, dtype=object))
+        return data_frame[np.isin(data_frame[COL_DATE_CODE].to_numpy(), process_days)]\
+            .drop(columns=[COL_ISIN_CODE, COL_DATE_CODE]).reset_index(drop=True)
+
+    def load(self, data_frame: pd.DataFrame, run_id: str = None, run_time: datetime = None):
         """
         Saves a Pandas DataFrame to the target
 
         :param data_frame: Pandas DataFrame as Input
+        :param run_id: id of a run that can be loaded more than once, e.g. by the merge of the workers.
+            The target key is derived from it and run_time and the meta file is only updated if the dates
+            of the run are not recorded yet, so loading the run again doesn't duplicate report files or meta entries.
+        :param run_time: time of the run in the target key, now if None.
+            The keys order the report files by run time, the compaction keeps the rows of the latest run.
         """
 
         # Creating target key
         target_key = (
             f'{self.trg_args.trg_key}'
-            f'{datetime.today().strftime( self.trg_args.trg_key_date_format )}.'
+            f'{(run_time or datetime.today()).strftime( self.trg_args.trg_key_date_format )}'
+            f'{f"_{run_id}" if run_id else ""}.'
             f'{self.trg_args.trg_format}'
         )
 
         # Writing to target
-        self.s3_bucket_trg.write_df_to_s3_bucket(data_frame, target_key, self.trg_args.trg_format)
+        written = self.s3_bucket_trg.write_df_to_s3_bucket(data_frame, target_key, self.trg_args.trg_format)
         self._logger.info('Xetra target data successfully written.')
 
-        # Updating meta file
-        MetaProcess.update_meta_file(self.meta_update_list, self.meta_key, self.s3_bucket_trg)
-        self._logger.info('Xetra meta file successfully updated.')
+        # Publishing the new file in the manifest, an unpublished file is picked up by the next compaction
+        if self.manifest and written:
+            try:
+                self.manifest.add_files([self.manifest.file_entry(target_key, data_frame)])
+            except Exception:
+                # The report is written, so the meta file still has to record its dates
+                self._logger.exception('Manifest update failed, %s is added by the next compaction.', target_key)
+
+        # Updating the rolling-window state next to the meta file,
+        # before the meta file, as reprocessing days replaces their rows in the state
+        if self.window_state is not None:
+            self.rolling_window.write_state(self.window_state, self.s3_bucket_trg)
+            self._logger.info('Xetra window state successfully updated.')
+
+        # Persisting ISINs seen for the first time in this run
+        if self.symbol_table.write():
+            self._logger.info('Xetra symbol table successfully updated.')
+
+        # Updating meta file, which marks the dates as processed
+        if run_id and MetaProcess.contains_dates(self.meta_update_list, self.meta_key, self.s3_bucket_trg):
+            self._logger.info('Dates of run %s are already in the meta file.', run_id)
+        else:
+            MetaProcess.update_meta_file(self.meta_update_list, self.meta_key, self.s3_bucket_trg)
+            self._logger.info('Xetra meta file successfully updated.')
         return True
 
     def etl_report1(self):
@@ -174,11 +545,25 @@ class XetraETL:
         Extract, transform and load to create report 1
         """
 
-        # Extraction
-        data_frame = self.extract()
-
-        # Transformation
-        data_frame = self.transform_report1(data_frame)
+        # Picking in-memory or streaming execution based on the source sizes
+        plan = self.plan_execution()
+
+        if self.aggregate_store:
+            # Extraction and aggregation of days with changed source files only,
+            # in batches of days as given by the plan
+            data_frame = self.extract_materialized()
+            # Transformation
+            data_frame = self.finalize_report1(data_frame)
+        elif plan and plan.strategy == ExecutionStrategy.STREAMING.value:
+            # Extraction and aggregation per batch of days
+            data_frame = self.extract_streaming()
+            # Transformation
+            data_frame = self.finalize_report1(data_frame)
+        else:
+            # Extraction
+            data_frame = self.extract()
+            # Transformation
+            data_frame = self.transform_report1(data_frame)
 
         # Load
         self.load(data_frame)